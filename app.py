@@ -6,12 +6,17 @@ import json
 import tempfile
 import re
 import html
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, Any, List
-from urllib.parse import urlparse
+from typing import Optional, Tuple, Dict, Any, List, Iterator, Generator
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # 导入模块化组件
 from config import config
+from utils import json_loads, json_dumps_bytes, create_session
 # 已移除 mcp_direct_client，使用 enhanced_mcp_client
 from export_manager import export_manager
 from prompt_optimizer import prompt_optimizer
@@ -29,6 +34,67 @@ logger = logging.getLogger(__name__)
 API_KEY = config.ai_model.api_key
 API_URL = config.ai_model.api_url
 
+# AI接口请求头 - 只构建一次，各次调用复用
+API_HEADERS = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
+
+# AI接口共享HTTP会话 - 复用TCP/TLS连接，避免每次请求重新握手
+# 该会话只访问AI接口，请求头直接设置在会话上；链接探测与MCP调用各有独立会话
+SESSION = create_session(pool_connections=4, pool_maxsize=8, headers=API_HEADERS)
+
+# 参考链接可访问性探测超时（秒）- 只需拿到响应头
+URL_PROBE_TIMEOUT = 5
+
+# 链接探测专用会话 - 不重试，探测耗时不超过一次超时（HEAD不支持时再加一次GET）
+PROBE_SESSION = create_session(pool_connections=2, pool_maxsize=4, retries=0)
+
+# 链接知识缓存 - 示例链接等内容很少变化，避免每次点击都重新调用MCP抓取
+URL_KNOWLEDGE_CACHE_SIZE = 128
+URL_KNOWLEDGE_CACHE_TTL = 3600  # 秒
+_url_knowledge_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_url_knowledge_lock = threading.Lock()
+
+# 磁盘缓存清理间隔（秒）- 写入缓存时顺带删除过期条目，最多每小时扫描一次目录
+CACHE_PRUNE_INTERVAL = 3600
+_last_cache_prune: Optional[float] = None
+_cache_prune_lock = threading.Lock()
+
+# MCP状态探测共享线程池 - 两个服务并行探测；探测为单飞执行，两个工作线程即可
+MCP_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mcp")
+
+# MCP服务状态缓存 - 状态探测需要实际调用两个MCP服务，短时间内复用上次结果
+MCP_STATUS_CACHE_TTL = 15  # 秒
+_mcp_status_cache: Tuple[float, str] = (0.0, "")
+_mcp_status_inflight: Optional[Future] = None  # 正在进行的探测，并发调用共享其结果
+_mcp_status_lock = threading.Lock()
+
+# 流式输出刷新间隔（秒）- 最多每50毫秒向界面推送一次
+STREAM_UPDATE_INTERVAL = 0.05
+
+# 临时下载文件写入块大小（字符数）
+TEMP_FILE_CHUNK_SIZE = 1 << 16
+
+# 前端静态资源配置 - 脚本以外部文件加载，浏览器可复用缓存与编译结果
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+FRONTEND_JS_PATH = os.path.join(STATIC_DIR, "vibedoc.js")
+MERMAID_CDN_URL = "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"
+STATIC_VERSION_LENGTH = 12
+
+def get_static_version(file_path: str) -> str:
+    """根据文件内容生成版本号，文件变更时自动刷新浏览器缓存"""
+    try:
+        with open(file_path, 'rb') as static_file:
+            return hashlib.sha256(static_file.read()).hexdigest()[:STATIC_VERSION_LENGTH]
+    except OSError as e:
+        logger.warning(f"⚠️ 无法读取静态资源 {file_path}: {e}")
+        return "dev"
+
+gr.set_static_paths(paths=[STATIC_DIR])
+# Gradio 在页面加载后动态插入这些脚本，加载顺序不固定，vibedoc.js 会自行等待 mermaid 就绪
+FRONTEND_HEAD_HTML = f"""
+<script src="{MERMAID_CDN_URL}"></script>
+<script src="/gradio_api/file={FRONTEND_JS_PATH}?v={get_static_version(FRONTEND_JS_PATH)}"></script>
+"""
+
 # 应用启动时的初始化
 logger.info("🚀 VibeDoc：您的随身AI产品经理与架构师")
 logger.info("📦 Version: 2.0.0 | Open Source Edition")
@@ -93,35 +159,41 @@ def optimize_user_idea(user_idea: str) -> Tuple[str, str]:
     else:
         return user_idea, f"⚠️ 优化失败：{suggestions}"
 
-def validate_input(user_idea: str) -> Tuple[bool, str]:
-    """验证用户输入"""
+# 参考链接格式 - 仅接受http/https链接
+REFERENCE_URL_PATTERN = re.compile(r"^https?://[^\s/$.?#][^\s]*$", re.IGNORECASE)
+
+def validate_input(user_idea: str, reference_url: str = "") -> Tuple[bool, str]:
+    """验证用户输入，在发起任何网络请求或AI调用之前拒绝无效的创意描述和参考链接"""
     if not user_idea or not user_idea.strip():
         return False, "❌ 请输入您的产品创意！"
     
     if len(user_idea.strip()) < 10:
         return False, "❌ 产品创意描述太短，请提供更详细的信息"
     
+    reference_url = (reference_url or "").strip()
+    # 正则已保证协议为 http(s) 且主机部分非空，无需再用 urlparse 解析一遍
+    if reference_url and not REFERENCE_URL_PATTERN.match(reference_url):
+        return False, "❌ 参考链接格式错误，请输入以 http:// 或 https:// 开头的完整链接"
+    
     return True, ""
 
+# 通用URL格式 - 协议 + "://" + 以字母数字开头的主机（或方括号包裹的IPv6地址）
+URL_SCHEME_NETLOC_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://(?:[A-Za-z0-9]|\[[0-9A-Fa-f:.]+\])")
+
 def validate_url(url: str) -> bool:
-    """验证URL格式"""
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except Exception:
-        return False
+    """验证URL格式（同时包含协议和主机），忽略首尾空白"""
+    return bool(URL_SCHEME_NETLOC_PATTERN.match(url.strip()))
 
 def fetch_knowledge_from_url_via_mcp(url: str) -> tuple[bool, str]:
     """通过增强版异步MCP服务从URL获取知识"""
-    from enhanced_mcp_client import call_fetch_mcp_async, call_deepwiki_mcp_async
+    from enhanced_mcp_client import call_deepwiki_mcp_async
     
     # 智能选择MCP服务
     if "deepwiki.org" in url.lower():
-        # DeepWiki MCP 专门处理 deepwiki.org 域名
+        # DeepWiki MCP 专门处理 deepwiki.org 域名，失败时才改用 Fetch MCP，避免重复调用
+        logger.info(f"🔍 检测到 deepwiki.org 链接，使用 DeepWiki MCP: {url}")
         try:
-            logger.info(f"🔍 检测到 deepwiki.org 链接，使用异步 DeepWiki MCP: {url}")
             result = call_deepwiki_mcp_async(url)
-            
             if result.success and result.data and len(result.data.strip()) > 10:
                 logger.info(f"✅ DeepWiki MCP异步调用成功，内容长度: {len(result.data)}, 耗时: {result.execution_time:.2f}s")
                 return True, result.data
@@ -131,8 +203,14 @@ def fetch_knowledge_from_url_via_mcp(url: str) -> tuple[bool, str]:
             logger.error(f"❌ DeepWiki MCP调用异常，改用 Fetch MCP: {str(e)}")
     
     # 使用通用的异步 Fetch MCP 服务
+    logger.info(f"🌐 使用异步 Fetch MCP 获取内容: {url}")
+    return _fetch_via_fetch_mcp(url)
+
+def _fetch_via_fetch_mcp(url: str) -> tuple[bool, str]:
+    """调用 Fetch MCP 获取内容并检查结果"""
+    from enhanced_mcp_client import call_fetch_mcp_async
+    
     try:
-        logger.info(f"🌐 使用异步 Fetch MCP 获取内容: {url}")
         result = call_fetch_mcp_async(url, max_length=8000)  # 增加长度限制
         
         if result.success and result.data and len(result.data.strip()) > 10:
@@ -145,25 +223,60 @@ def fetch_knowledge_from_url_via_mcp(url: str) -> tuple[bool, str]:
         logger.error(f"❌ Fetch MCP调用异常: {str(e)}")
         return False, f"MCP服务调用异常: {str(e)}"
 
-def get_mcp_status_display() -> str:
-    """获取MCP服务状态显示"""
+def get_mcp_status_display(force: bool = False) -> str:
+    """获取MCP服务状态显示，有效期内直接返回缓存的探测结果（force=True 时强制重新探测）"""
+    global _mcp_status_cache, _mcp_status_inflight
+    with _mcp_status_lock:
+        checked_at, status = _mcp_status_cache
+        if not force and status and time.monotonic() - checked_at < MCP_STATUS_CACHE_TTL:
+            return status
+        
+        # 已有探测在进行时等待其结果，不在持锁期间调用MCP服务，也不重复探测
+        probe = _mcp_status_inflight
+        if probe is None:
+            probe = _mcp_status_inflight = Future()
+            is_owner = True
+        else:
+            is_owner = False
+    
+    if not is_owner:
+        return probe.result()
+    
+    status = ""
+    try:
+        status = _probe_mcp_status_display()
+        return status
+    finally:
+        with _mcp_status_lock:
+            if status:
+                _mcp_status_cache = (time.monotonic(), status)
+            _mcp_status_inflight = None
+        probe.set_result(status)
+
+def _probe_mcp_status_display() -> str:
+    """实际探测MCP服务并生成状态显示"""
     try:
         from enhanced_mcp_client import async_mcp_client
 
-        # 快速测试两个服务的连通性
-        services_status = []
+        # 并行测试两个服务的连通性，总耗时取决于较慢的一个而不是两者之和
+        fetch_future = MCP_EXECUTOR.submit(
+            async_mcp_client.call_mcp_service_async,
+            "fetch", "fetch", {"url": "https://httpbin.org/get", "max_length": 100},
+            use_cache=False
+        )
+        deepwiki_future = MCP_EXECUTOR.submit(
+            async_mcp_client.call_mcp_service_async,
+            "deepwiki", "deepwiki_fetch", {"url": "https://deepwiki.org/openai/openai-python", "mode": "aggregate"},
+            use_cache=False
+        )
+        fetch_test_result = fetch_future.result()
+        deepwiki_test_result = deepwiki_future.result()
 
         # 测试Fetch MCP
-        fetch_test_result = async_mcp_client.call_mcp_service_async(
-            "fetch", "fetch", {"url": "https://httpbin.org/get", "max_length": 100}
-        )
         fetch_ok = fetch_test_result.success
         fetch_time = fetch_test_result.execution_time
 
         # 测试DeepWiki MCP
-        deepwiki_test_result = async_mcp_client.call_mcp_service_async(
-            "deepwiki", "deepwiki_fetch", {"url": "https://deepwiki.org/openai/openai-python", "mode": "aggregate"}
-        )
         deepwiki_ok = deepwiki_test_result.success
         deepwiki_time = deepwiki_test_result.execution_time
 
@@ -198,100 +311,70 @@ def get_mcp_status_display() -> str:
     except Exception as e:
         return f"## MCP服务状态\n- ❌ **检查失败**: {str(e)}\n- 💡 请确保enhanced_mcp_client.py文件存在"
 
-def call_mcp_service(url: str, payload: Dict[str, Any], service_name: str, timeout: int = 120) -> Tuple[bool, str]:
-    """统一的MCP服务调用函数
-    
-    Args:
-        url: MCP服务URL
-        payload: 请求载荷
-        service_name: 服务名称（用于日志）
-        timeout: 超时时间
-        
-    Returns:
-        (success, data): 成功标志和返回数据
+def probe_url_status(url: str) -> int:
     """
-    try:
-        logger.info(f"🔥 DEBUG: Calling {service_name} MCP service at {url}")
-        logger.info(f"🔥 DEBUG: Payload: {json.dumps(payload, ensure_ascii=False, indent=2)}")
-        
-        response = requests.post(
-            url,
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=timeout
-        )
-        
-        logger.info(f"🔥 DEBUG: Response status: {response.status_code}")
-        logger.info(f"🔥 DEBUG: Response headers: {dict(response.headers)}")
-        
-        try:
-            response_data = response.json()
-            logger.info(f"🔥 DEBUG: Response JSON: {json.dumps(response_data, ensure_ascii=False, indent=2)}")
-        except:
-            response_text = response.text[:1000]  # 只打印前1000个字符
-            logger.info(f"🔥 DEBUG: Response text: {response_text}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            # 检查多种可能的响应格式
-            content = None
-            if "data" in data and data["data"]:
-                content = data["data"]
-            elif "result" in data and data["result"]:
-                content = data["result"]
-            elif "content" in data and data["content"]:
-                content = data["content"]
-            elif "message" in data and data["message"]:
-                content = data["message"]
-            else:
-                # 如果以上都没有，尝试直接使用整个响应
-                content = str(data)
-            
-            if content and len(str(content).strip()) > 10:
-                logger.info(f"✅ {service_name} MCP service returned {len(str(content))} characters")
-                return True, str(content)
-            else:
-                logger.warning(f"⚠️ {service_name} MCP service returned empty or invalid data: {data}")
-                return False, f"❌ {service_name} MCP返回空数据或格式错误"
-        else:
-            logger.error(f"❌ {service_name} MCP service failed with status {response.status_code}")
-            logger.error(f"❌ Response content: {response.text[:500]}")
-            return False, f"❌ {service_name} MCP调用失败: HTTP {response.status_code}"
-            
-    except requests.exceptions.Timeout:
-        logger.error(f"⏰ {service_name} MCP service timeout after {timeout}s")
-        return False, f"❌ {service_name} MCP调用超时"
-    except requests.exceptions.ConnectionError as e:
-        logger.error(f"🔌 {service_name} MCP service connection failed: {str(e)}")
-        return False, f"❌ {service_name} MCP连接失败"
-    except Exception as e:
-        logger.error(f"💥 {service_name} MCP service error: {str(e)}")
-        return False, f"❌ {service_name} MCP调用错误: {str(e)}"
-
-def fetch_external_knowledge(reference_url: str) -> str:
-    """获取外部知识库内容 - 使用模块化MCP管理器，防止虚假链接生成"""
-    if not reference_url or not reference_url.strip():
-        return ""
+    探测链接可访问性，只测量到响应头为止。
     
-    # 验证URL是否可访问
-    url = reference_url.strip()
-    logger.info(f"🔍 开始处理外部参考链接: {url}")
+    优先使用短超时的HEAD请求；部分站点不支持HEAD（返回405/501），
+    此时改用流式GET，拿到状态码后立即关闭连接，不下载响应体。
+    """
+    response = PROBE_SESSION.head(url, timeout=URL_PROBE_TIMEOUT, allow_redirects=True)
+    if response.status_code not in (405, 501):
+        return response.status_code
+    
+    with PROBE_SESSION.get(url, timeout=URL_PROBE_TIMEOUT, allow_redirects=True, stream=True) as response:
+        return response.status_code
+
+def remember_knowledge(url: str, knowledge: str) -> None:
+    """将链接知识写入内存LRU缓存，超出容量时淘汰最久未使用的条目"""
+    with _url_knowledge_lock:
+        _url_knowledge_cache[url] = (time.monotonic(), knowledge)
+        _url_knowledge_cache.move_to_end(url)
+        while len(_url_knowledge_cache) > URL_KNOWLEDGE_CACHE_SIZE:
+            _url_knowledge_cache.popitem(last=False)
+
+def get_cached_knowledge(url: str) -> Optional[str]:
+    """查询链接知识缓存（先内存后磁盘），磁盘命中时写回内存；未命中返回None"""
+    with _url_knowledge_lock:
+        cached = _url_knowledge_cache.get(url)
+        if cached and time.monotonic() - cached[0] < URL_KNOWLEDGE_CACHE_TTL:
+            _url_knowledge_cache.move_to_end(url)
+            logger.info(f"⚡ 命中链接知识缓存: {url}")
+            return cached[1]
+    
+    # 内存未命中时查询磁盘缓存（进程重启或多进程部署时仍可复用）
+    knowledge = load_cached_knowledge(url)
+    if knowledge is not None:
+        logger.info(f"💾 命中链接知识磁盘缓存: {url}")
+        remember_knowledge(url, knowledge)
+    return knowledge
+
+def fetch_and_cache_knowledge(url: str) -> tuple[bool, str]:
+    """缓存未命中时通过MCP获取链接知识，成功结果写入内存和磁盘缓存（调用方已查询过缓存）"""
+    success, knowledge = fetch_knowledge_from_url_via_mcp(url)
+    # 只缓存成功结果，失败时下次仍会重新尝试
+    if success:
+        save_cached_knowledge(url, knowledge)
+        remember_knowledge(url, knowledge)
     
+    return success, knowledge
+
+def check_reference_url(url: str) -> Optional[str]:
+    """探测参考链接可访问性，不可访问或无法验证时返回提示内容，可访问时返回None"""
     try:
         # 简单的HEAD请求检查URL是否存在
         logger.info(f"🌐 验证链接可访问性: {url}")
-        response = requests.head(url, timeout=10, allow_redirects=True)
-        logger.info(f"📡 链接验证结果: HTTP {response.status_code}")
+        status_code = probe_url_status(url)
+        logger.info(f"📡 链接验证结果: HTTP {status_code}")
         
-        if response.status_code >= 400:
-            logger.warning(f"⚠️ 提供的URL不可访问: {url} (HTTP {response.status_code})")
+        if status_code >= 400:
+            logger.warning(f"⚠️ 提供的URL不可访问: {url} (HTTP {status_code})")
             return f"""
 ## ⚠️ 参考链接状态提醒
 
 **🔗 提供的链接**: {url}
 
-**❌ 链接状态**: 无法访问 (HTTP {response.status_code})
+**❌ 链接状态**: 无法访问 (HTTP {status_code})
 
 **💡 建议**: 
 - 请检查链接是否正确
@@ -301,7 +384,7 @@ def fetch_external_knowledge(reference_url: str) -> str:
 ---
 """
         else:
-            logger.info(f"✅ 链接可访问，状态码: {response.status_code}")
+            logger.info(f"✅ 链接可访问，状态码: {status_code}")
             
     except requests.exceptions.Timeout:
         logger.warning(f"⏰ URL验证超时: {url}")
@@ -334,11 +417,31 @@ def fetch_external_knowledge(reference_url: str) -> str:
 ---
 """
     
+    return None
+
+def fetch_external_knowledge(reference_url: str) -> str:
+    """获取外部知识库内容 - 使用模块化MCP管理器，防止虚假链接生成"""
+    if not reference_url or not reference_url.strip():
+        return ""
+    
+    url = reference_url.strip()
+    logger.info(f"🔍 开始处理外部参考链接: {url}")
+    
+    # 已缓存的链接此前获取成功过，无需再次探测可访问性
+    cached_knowledge = get_cached_knowledge(url)
+    if cached_knowledge is None:
+        url_notice = check_reference_url(url)
+        if url_notice:
+            return url_notice
+    
     # 尝试调用MCP服务
     logger.info(f"🔄 尝试调用MCP服务获取知识...")
-    mcp_start_time = datetime.now()
-    success, knowledge = fetch_knowledge_from_url_via_mcp(url)
-    mcp_duration = (datetime.now() - mcp_start_time).total_seconds()
+    mcp_start_time = time.monotonic()
+    if cached_knowledge is not None:
+        success, knowledge = True, cached_knowledge
+    else:
+        success, knowledge = fetch_and_cache_knowledge(url)
+    mcp_duration = time.monotonic() - mcp_start_time
     
     logger.info(f"📊 MCP服务调用结果: 成功={success}, 内容长度={len(knowledge) if knowledge else 0}, 耗时={mcp_duration:.2f}秒")
     
@@ -399,78 +502,6 @@ def fetch_external_knowledge(reference_url: str) -> str:
 ---
 """
 
-def generate_enhanced_reference_info(url: str, source_type: str, error_msg: str = None) -> str:
-    """生成增强的参考信息，当MCP服务不可用时提供有用的上下文"""
-    from urllib.parse import urlparse
-    
-    parsed_url = urlparse(url)
-    domain = parsed_url.netloc
-    path = parsed_url.path
-    
-    # 根据URL结构推断内容类型
-    content_hints = []
-    
-    # 检测常见的技术站点
-    if "github.com" in domain:
-        content_hints.append("💻 开源代码仓库")
-    elif "stackoverflow.com" in domain:
-        content_hints.append("❓ 技术问答")
-    elif "medium.com" in domain:
-        content_hints.append("📝 技术博客")
-    elif "dev.to" in domain:
-        content_hints.append("👨‍💻 开发者社区")
-    elif "csdn.net" in domain:
-        content_hints.append("🇨🇳 CSDN技术博客")
-    elif "juejin.cn" in domain:
-        content_hints.append("💎 掘金技术文章")
-    elif "zhihu.com" in domain:
-        content_hints.append("🧠 知乎技术讨论")
-    elif "blog" in domain:
-        content_hints.append("📖 技术博客")
-    elif "docs" in domain:
-        content_hints.append("📚 技术文档")
-    elif "wiki" in domain:
-        content_hints.append("📖 知识库")
-    else:
-        content_hints.append("🔗 参考资料")
-    
-    # 根据路径推断内容
-    if "/article/" in path or "/post/" in path:
-        content_hints.append("📄 文章内容")
-    elif "/tutorial/" in path:
-        content_hints.append("📚 教程指南")
-    elif "/docs/" in path:
-        content_hints.append("📖 技术文档")
-    elif "/guide/" in path:
-        content_hints.append("📋 使用指南")
-    
-    hint_text = " | ".join(content_hints) if content_hints else "📄 网页内容"
-    
-    reference_info = f"""
-## 🔗 {source_type}参考
-
-**📍 来源链接：** [{domain}]({url})
-
-**🏷️ 内容类型：** {hint_text}
-
-**🤖 AI增强分析：** 
-> 虽然MCP服务暂时不可用，但AI将基于链接信息和上下文进行智能分析，
-> 并在生成的开发计划中融入该参考资料的相关性建议。
-
-**📋 参考价值：**
-- ✅ 提供技术选型参考
-- ✅ 补充实施细节
-- ✅ 增强方案可行性
-- ✅ 丰富最佳实践
-
----
-"""
-    
-    if error_msg and not error_msg.startswith("❌"):
-        reference_info += f"\n**⚠️ 服务状态：** {error_msg}\n"
-    
-    return reference_info
-
 def validate_and_fix_content(content: str) -> str:
     """验证和修复生成的内容，包括Mermaid语法、链接验证等"""
     if not content:
@@ -699,6 +730,16 @@ def validate_and_clean_links(content: str) -> str:
     
     return content
 
+# 生成内容中允许保留为可点击链接的技术文档网站
+TRUSTED_LINK_DOMAINS = (
+    'docs.python.org', 'nodejs.org', 'reactjs.org', 'vuejs.org',
+    'angular.io', 'flask.palletsprojects.com', 'fastapi.tiangolo.com',
+    'docker.com', 'kubernetes.io', 'github.com', 'gitlab.com',
+    'stackoverflow.com', 'developer.mozilla.org', 'w3schools.com',
+    'jwt.io', 'redis.io', 'mongodb.com', 'postgresql.org',
+    'mysql.com', 'nginx.org', 'apache.org'
+)
+
 def enhance_real_links(content: str) -> str:
     """验证并增强真实链接的可用性"""
     import re
@@ -714,20 +755,10 @@ def enhance_real_links(content: str) -> str:
         if not validate_url(link_url):
             return f"**{link_text}** (参考资源)"
         
-        # 检查是否是常见的技术文档网站
-        trusted_domains = [
-            'docs.python.org', 'nodejs.org', 'reactjs.org', 'vuejs.org',
-            'angular.io', 'flask.palletsprojects.com', 'fastapi.tiangolo.com',
-            'docker.com', 'kubernetes.io', 'github.com', 'gitlab.com',
-            'stackoverflow.com', 'developer.mozilla.org', 'w3schools.com',
-            'jwt.io', 'redis.io', 'mongodb.com', 'postgresql.org',
-            'mysql.com', 'nginx.org', 'apache.org'
-        ]
-        
-        # 如果是受信任的域名，保留链接
-        for domain in trusted_domains:
-            if domain in link_url.lower():
-                return f"[{link_text}]({link_url})"
+        # 如果是常见的受信任技术文档网站，保留链接
+        link_url_lower = link_url.lower()
+        if any(domain in link_url_lower for domain in TRUSTED_LINK_DOMAINS):
+            return f"[{link_text}]({link_url})"
         
         # 对于其他链接，转换为安全的文本引用
         return f"**{link_text}** (技术参考)"
@@ -792,121 +823,11 @@ def fix_formatting_issues(content: str) -> str:
     
     return content
 
-def generate_development_plan(user_idea: str, reference_url: str = "") -> Tuple[str, str, str]:
-    """
-    基于用户创意生成完整的产品开发计划和对应的AI编程助手提示词。
-    
-    Args:
-        user_idea (str): 用户的产品创意描述
-        reference_url (str): 可选的参考链接
-        
-    Returns:
-        Tuple[str, str, str]: 开发计划、AI编程提示词、临时文件路径
-    """
-    # 开始处理链条追踪
-    explanation_manager.start_processing()
-    start_time = datetime.now()
-    
-    # 步骤1: 验证输入
-    validation_start = datetime.now()
-    is_valid, error_msg = validate_input(user_idea)
-    validation_duration = (datetime.now() - validation_start).total_seconds()
-    
-    explanation_manager.add_processing_step(
-        stage=ProcessingStage.INPUT_VALIDATION,
-        title="输入验证",
-        description="验证用户输入的创意描述是否符合要求",
-        success=is_valid,
-        details={
-            "输入长度": len(user_idea.strip()) if user_idea else 0,
-            "包含参考链接": bool(reference_url),
-            "验证结果": "通过" if is_valid else error_msg
-        },
-        duration=validation_duration,
-        quality_score=100 if is_valid else 0,
-        evidence=f"用户输入: '{user_idea[:50]}...' (长度: {len(user_idea.strip()) if user_idea else 0}字符)"
-    )
-    
-    if not is_valid:
-        return error_msg, "", None
-    
-    # 步骤2: API密钥检查
-    api_check_start = datetime.now()
-    if not API_KEY:
-        api_check_duration = (datetime.now() - api_check_start).total_seconds()
-        explanation_manager.add_processing_step(
-            stage=ProcessingStage.AI_GENERATION,
-            title="API密钥检查",
-            description="检查AI模型API密钥配置",
-            success=False,
-            details={"错误": "API密钥未配置"},
-            duration=api_check_duration,
-            quality_score=0,
-            evidence="系统环境变量中未找到SILICONFLOW_API_KEY"
-        )
-        
-        logger.error("API key not configured")
-        error_msg = """
-## ❌ 配置错误：未设置API密钥
-
-### 🔧 解决方法：
-
-1. **获取API密钥**：
-   - 访问 [Silicon Flow](https://siliconflow.cn) 
-   - 注册账户并获取API密钥
-
-2. **配置环境变量**：
-   ```bash
-   export SILICONFLOW_API_KEY=your_api_key_here
-   ```
+# 开发计划系统提示词 - 防止虚假链接生成，强化编程提示词生成，增强视觉化内容，加强日期上下文
+# 不含任何随请求变化的内容，保证每次请求的前缀逐字节相同，便于服务端复用前缀KV缓存
+PLAN_SYSTEM_PROMPT = """你是一个资深技术项目经理，精通产品规划和 AI 编程助手（如 GitHub Copilot、ChatGPT Code）提示词撰写。
 
-3. **魔塔平台配置**：
-   - 在创空间设置中添加环境变量
-   - 变量名：`SILICONFLOW_API_KEY`
-   - 变量值：你的实际API密钥
-
-### 📋 配置完成后重启应用即可使用完整功能！
-
----
-
-**💡 提示**：API密钥是必填项，没有它就无法调用AI服务生成开发计划。
-"""
-        return error_msg, "", None
-    
-    # 步骤3: 获取外部知识库内容
-    knowledge_start = datetime.now()
-    retrieved_knowledge = fetch_external_knowledge(reference_url)
-    knowledge_duration = (datetime.now() - knowledge_start).total_seconds()
-    
-    explanation_manager.add_processing_step(
-        stage=ProcessingStage.KNOWLEDGE_RETRIEVAL,
-        title="外部知识获取",
-        description="从MCP服务获取外部参考知识",
-        success=bool(retrieved_knowledge and "成功获取" in retrieved_knowledge),
-        details={
-            "参考链接": reference_url or "无",
-            "MCP服务状态": get_mcp_status_display(),
-            "知识内容长度": len(retrieved_knowledge) if retrieved_knowledge else 0
-        },
-        duration=knowledge_duration,
-        quality_score=80 if retrieved_knowledge else 50,
-        evidence=f"获取的知识内容: '{retrieved_knowledge[:100]}...' (长度: {len(retrieved_knowledge) if retrieved_knowledge else 0}字符)"
-    )
-    
-    # 获取当前日期并计算项目开始日期
-    current_date = datetime.now()
-    # 项目开始日期：下周一开始（给用户准备时间）
-    days_until_monday = (7 - current_date.weekday()) % 7
-    if days_until_monday == 0:  # 如果今天是周一，则下周一开始
-        days_until_monday = 7
-    project_start_date = current_date + timedelta(days=days_until_monday)
-    project_start_str = project_start_date.strftime("%Y-%m-%d")
-    current_year = current_date.year
-    
-    # 构建系统提示词 - 防止虚假链接生成，强化编程提示词生成，增强视觉化内容，加强日期上下文
-    system_prompt = f"""你是一个资深技术项目经理，精通产品规划和 AI 编程助手（如 GitHub Copilot、ChatGPT Code）提示词撰写。
-
-📅 **当前时间上下文**：今天是 {current_date.strftime("%Y年%m月%d日")}，当前年份是 {current_year} 年。所有项目时间必须基于当前时间合理规划。
+📅 **当前时间上下文**：今天的日期、当前年份和项目开始日期在用户消息的"时间上下文"中给出。所有项目时间必须基于当前时间合理规划。
 
 🔴 重要要求：
 1. 当收到外部知识库参考时，你必须在开发计划中明确引用和融合这些信息
@@ -964,7 +885,7 @@ flowchart TD
 ```mermaid
 flowchart TD
     Start([开始]) --> Input[用户输入]
-    Input --> Validate{{验证输入}}
+    Input --> Validate{验证输入}
     Validate -->|有效| Process[处理数据]
     Validate -->|无效| Error[显示错误]
     Process --> Save[保存结果]
@@ -981,7 +902,7 @@ gantt
     axisFormat %m-%d
     
     section 需求分析
-    需求调研     :done, req1, {project_start_str}, 3d
+    需求调研     :done, req1, 项目开始日期, 3d
     需求整理     :done, req2, after req1, 4d
     
     section 系统设计
@@ -999,8 +920,8 @@ gantt
 ```
 
 ⚠️ **日期生成规则**：
-- 项目开始日期：{project_start_str}（下周一开始）
-- 所有日期必须基于 {current_year} 年及以后
+- 项目开始日期：使用时间上下文中给出的项目开始日期（下周一开始），甘特图中的"项目开始日期"必须替换为该真实日期
+- 所有日期必须基于当前年份及以后
 - 严禁使用 2024 年以前的日期
 - 里程碑日期必须与甘特图保持一致
 
@@ -1046,8 +967,300 @@ gantt
 
 格式要求：先输出开发计划，然后输出编程提示词部分。"""
 
-    # 构建用户提示词
-    user_prompt = f"""产品创意：{user_idea}"""
+def get_plan_cache_key(user_idea: str, reference_url: str) -> str:
+    """根据规范化后的创意描述和参考链接生成缓存键"""
+    normalized_input = f"{user_idea.strip().lower()}\0{(reference_url or '').strip()}"
+    return hashlib.blake2b(normalized_input.encode('utf-8'), digest_size=16).hexdigest()
+
+def get_plan_cache_path(cache_key: str) -> str:
+    """获取缓存文件路径"""
+    return os.path.join(config.plan_cache_dir, f"{cache_key}.json")
+
+def read_cache_file(cache_path: str, ttl: float) -> Optional[Dict[str, Any]]:
+    """读取磁盘缓存文件，未命中、过期或损坏时返回None"""
+    if not config.plan_cache_enabled:
+        return None
+    
+    try:
+        # 缓存过期则视为未命中，保证内容不过时
+        cache_age = datetime.now().timestamp() - os.path.getmtime(cache_path)
+        if cache_age > ttl:
+            return None
+        
+        with open(cache_path, 'rb') as cache_file:
+            return json_loads(cache_file.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ 读取缓存失败: {cache_path} - {e}")
+        return None
+
+def write_cache_file(cache_path: str, payload: Dict[str, Any]) -> bool:
+    """将内容写入磁盘缓存文件，成功时返回True"""
+    if not config.plan_cache_enabled:
+        return False
+    
+    try:
+        os.makedirs(config.plan_cache_dir, exist_ok=True)
+        # 先写临时文件再替换，避免并发读取到半成品；每次写入使用独立的临时文件，
+        # 同一缓存键的并发写入不会互相覆盖
+        temp_fd, temp_path = tempfile.mkstemp(dir=config.plan_cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(temp_fd, 'wb') as cache_file:
+                cache_file.write(json_dumps_bytes({
+                    **payload,
+                    "created_at": datetime.now().isoformat()
+                }))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        logger.warning(f"⚠️ 写入缓存失败: {cache_path} - {e}")
+        return False
+    
+    prune_expired_cache_files()
+    return True
+
+def prune_expired_cache_files() -> None:
+    """删除缓存目录中已过期的条目和中断遗留的临时文件，按 CACHE_PRUNE_INTERVAL 节流执行"""
+    global _last_cache_prune
+    with _cache_prune_lock:
+        now = time.monotonic()
+        if _last_cache_prune is not None and now - _last_cache_prune < CACHE_PRUNE_INTERVAL:
+            return
+        _last_cache_prune = now
+    
+    try:
+        entries = list(os.scandir(config.plan_cache_dir))
+    except OSError as e:
+        logger.warning(f"⚠️ 扫描缓存目录失败: {config.plan_cache_dir} - {e}")
+        return
+    
+    current_time = datetime.now().timestamp()
+    removed_count = 0
+    for entry in entries:
+        if entry.name.endswith(".tmp"):
+            ttl = CACHE_PRUNE_INTERVAL
+        elif entry.name.startswith("knowledge-"):
+            ttl = URL_KNOWLEDGE_CACHE_TTL
+        elif entry.name.endswith(".json"):
+            ttl = config.plan_cache_ttl
+        else:
+            continue
+        
+        try:
+            if current_time - entry.stat().st_mtime > ttl:
+                os.remove(entry.path)
+                removed_count += 1
+        except OSError:
+            # 文件可能已被其他进程替换或删除
+            continue
+    
+    if removed_count:
+        logger.info(f"🧹 已清理 {removed_count} 个过期缓存文件")
+
+def load_cached_plan(cache_key: str) -> Optional[Tuple[str, str]]:
+    """读取磁盘缓存的开发计划，未命中、过期或损坏时返回None"""
+    cached = read_cache_file(get_plan_cache_path(cache_key), config.plan_cache_ttl)
+    try:
+        return (cached["plan"], cached["prompts"]) if cached else None
+    except (KeyError, TypeError):
+        return None
+
+def save_cached_plan(cache_key: str, plan: str, prompts: str) -> None:
+    """将生成成功的开发计划写入磁盘缓存"""
+    cache_path = get_plan_cache_path(cache_key)
+    if write_cache_file(cache_path, {"plan": plan, "prompts": prompts}):
+        logger.info(f"💾 开发计划已缓存: {cache_path}")
+
+def get_knowledge_cache_path(url: str) -> str:
+    """获取链接知识的磁盘缓存文件路径"""
+    url_key = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(config.plan_cache_dir, f"knowledge-{url_key}.json")
+
+def load_cached_knowledge(url: str) -> Optional[str]:
+    """读取磁盘缓存的链接知识，未命中、过期或损坏时返回None"""
+    cached = read_cache_file(get_knowledge_cache_path(url), URL_KNOWLEDGE_CACHE_TTL)
+    try:
+        return cached["knowledge"] if cached else None
+    except (KeyError, TypeError):
+        return None
+
+def save_cached_knowledge(url: str, knowledge: str) -> None:
+    """将成功获取的链接知识写入磁盘缓存，重启后仍可复用"""
+    write_cache_file(get_knowledge_cache_path(url), {"url": url, "knowledge": knowledge})
+
+def iter_stream_content(response) -> Iterator[str]:
+    """逐行解析SSE流式响应，依次产出AI生成的文本片段"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        
+        try:
+            choice = json_loads(data).get("choices", [{}])[0]
+        except (ValueError, IndexError):
+            logger.warning(f"⚠️ 无法解析的流式数据: {data[:100]}")
+            continue
+        
+        delta = choice.get("delta", {}).get("content")
+        if delta:
+            yield delta
+        
+        if choice.get("finish_reason"):
+            break
+
+def generate_development_plan(user_idea: str, reference_url: str = "") -> Generator[Tuple[str, str, str], None, bool]:
+    """
+    基于用户创意生成完整的产品开发计划和对应的AI编程助手提示词。
+    
+    采用流式调用，生成过程中持续产出已生成的部分内容，最后产出完整结果。
+    
+    Args:
+        user_idea (str): 用户的产品创意描述
+        reference_url (str): 可选的参考链接
+        
+    Yields:
+        Tuple[str, str, str]: 开发计划、AI编程提示词、临时文件路径（始终为None，下载文件按需生成）
+    
+    Returns:
+        bool: 是否成功生成完整方案（失败时最后产出的是错误提示）
+    """
+    # 开始处理链条追踪
+    explanation_manager.start_processing()
+    start_time = time.monotonic()
+    
+    # 步骤1: 验证输入
+    validation_start = time.monotonic()
+    is_valid, error_msg = validate_input(user_idea, reference_url)
+    validation_duration = time.monotonic() - validation_start
+    
+    explanation_manager.add_processing_step(
+        stage=ProcessingStage.INPUT_VALIDATION,
+        title="输入验证",
+        description="验证用户输入的创意描述和参考链接是否符合要求",
+        success=is_valid,
+        details={
+            "输入长度": len(user_idea.strip()) if user_idea else 0,
+            "包含参考链接": bool(reference_url),
+            "验证结果": "通过" if is_valid else error_msg
+        },
+        duration=validation_duration,
+        quality_score=100 if is_valid else 0,
+        evidence=f"用户输入: '{user_idea[:50]}...' (长度: {len(user_idea.strip()) if user_idea else 0}字符)"
+    )
+    
+    if not is_valid:
+        yield error_msg, "", None
+        return
+    
+    # 缓存命中时直接返回，跳过知识获取与AI调用
+    cache_key = get_plan_cache_key(user_idea, reference_url)
+    cached_plan = load_cached_plan(cache_key)
+    if cached_plan:
+        final_plan_text, prompts_text = cached_plan
+        explanation_manager.add_processing_step(
+            stage=ProcessingStage.AI_GENERATION,
+            title="方案缓存命中",
+            description="相同的创意描述和参考链接已生成过方案，直接复用缓存结果",
+            success=True,
+            details={
+                "缓存键": cache_key,
+                "方案长度": f"{len(final_plan_text)} 字符"
+            },
+            duration=time.monotonic() - start_time,
+            quality_score=90,
+            evidence=f"从缓存读取 {len(final_plan_text)} 字符的开发计划"
+        )
+        logger.info(f"⚡ 命中方案缓存: {cache_key}")
+        yield final_plan_text, prompts_text, None
+        return True
+    
+    # 步骤2: API密钥检查
+    api_check_start = time.monotonic()
+    if not API_KEY:
+        api_check_duration = time.monotonic() - api_check_start
+        explanation_manager.add_processing_step(
+            stage=ProcessingStage.AI_GENERATION,
+            title="API密钥检查",
+            description="检查AI模型API密钥配置",
+            success=False,
+            details={"错误": "API密钥未配置"},
+            duration=api_check_duration,
+            quality_score=0,
+            evidence="系统环境变量中未找到SILICONFLOW_API_KEY"
+        )
+        
+        logger.error("API key not configured")
+        error_msg = """
+## ❌ 配置错误：未设置API密钥
+
+### 🔧 解决方法：
+
+1. **获取API密钥**：
+   - 访问 [Silicon Flow](https://siliconflow.cn) 
+   - 注册账户并获取API密钥
+
+2. **配置环境变量**：
+   ```bash
+   export SILICONFLOW_API_KEY=your_api_key_here
+   ```
+
+3. **魔塔平台配置**：
+   - 在创空间设置中添加环境变量
+   - 变量名：`SILICONFLOW_API_KEY`
+   - 变量值：你的实际API密钥
+
+### 📋 配置完成后重启应用即可使用完整功能！
+
+---
+
+**💡 提示**：API密钥是必填项，没有它就无法调用AI服务生成开发计划。
+"""
+        yield error_msg, "", None
+        return
+    
+    # 步骤3: 获取外部知识库内容
+    knowledge_start = time.monotonic()
+    retrieved_knowledge = fetch_external_knowledge(reference_url)
+    knowledge_duration = time.monotonic() - knowledge_start
+    
+    explanation_manager.add_processing_step(
+        stage=ProcessingStage.KNOWLEDGE_RETRIEVAL,
+        title="外部知识获取",
+        description="从MCP服务获取外部参考知识",
+        success=bool(retrieved_knowledge and "成功获取" in retrieved_knowledge),
+        details={
+            "参考链接": reference_url or "无",
+            "MCP服务状态": get_mcp_status_display(),
+            "知识内容长度": len(retrieved_knowledge) if retrieved_knowledge else 0
+        },
+        duration=knowledge_duration,
+        quality_score=80 if retrieved_knowledge else 50,
+        evidence=f"获取的知识内容: '{retrieved_knowledge[:100]}...' (长度: {len(retrieved_knowledge) if retrieved_knowledge else 0}字符)"
+    )
+    
+    # 获取当前日期并计算项目开始日期
+    current_date = datetime.now()
+    # 项目开始日期：下周一开始（给用户准备时间）
+    days_until_monday = (7 - current_date.weekday()) % 7
+    if days_until_monday == 0:  # 如果今天是周一，则下周一开始
+        days_until_monday = 7
+    project_start_date = current_date + timedelta(days=days_until_monday)
+    project_start_str = project_start_date.strftime("%Y-%m-%d")
+    current_year = current_date.year
+    
+    # 构建用户提示词 - 随请求变化的日期放在用户消息中，系统提示词保持逐字节不变
+    user_prompt = f"""📅 时间上下文：今天是 {current_date.strftime("%Y年%m月%d日")}，当前年份是 {current_year} 年，项目开始日期为 {project_start_str}（下周一）。
+
+产品创意：{user_idea}"""
     
     # 如果成功获取到外部知识，则注入到提示词中
     if retrieved_knowledge and not any(keyword in retrieved_knowledge for keyword in ["❌", "⚠️", "处理说明", "暂时不可用"]):
@@ -1072,20 +1285,21 @@ gantt
         logger.info("🚀 开始调用AI API生成开发计划...")
         
         # 步骤3: AI生成准备
-        ai_prep_start = datetime.now()
+        ai_prep_start = time.monotonic()
         
         # 构建请求数据
         request_data = {
             "model": "Qwen/Qwen2.5-72B-Instruct",
             "messages": [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": PLAN_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             "max_tokens": 4096,  # 修复：API限制最大4096 tokens
-            "temperature": 0.7
+            "temperature": 0.7,
+            "stream": True  # 流式返回，首个token到达即可开始渲染
         }
         
-        ai_prep_duration = (datetime.now() - ai_prep_start).total_seconds()
+        ai_prep_duration = time.monotonic() - ai_prep_start
         
         explanation_manager.add_processing_step(
             stage=ProcessingStage.AI_GENERATION,
@@ -1094,169 +1308,187 @@ gantt
             success=True,
             details={
                 "AI模型": request_data['model'],
-                "系统提示词长度": f"{len(system_prompt)} 字符",
+                "系统提示词长度": f"{len(PLAN_SYSTEM_PROMPT)} 字符",
                 "用户提示词长度": f"{len(user_prompt)} 字符",
                 "最大Token数": request_data['max_tokens'],
                 "温度参数": request_data['temperature']
             },
             duration=ai_prep_duration,
             quality_score=95,
-            evidence=f"准备调用 {request_data['model']} 模型，提示词总长度: {len(system_prompt + user_prompt)} 字符"
+            evidence=f"准备调用 {request_data['model']} 模型，提示词总长度: {len(PLAN_SYSTEM_PROMPT + user_prompt)} 字符"
         )
         
         # 记录请求信息（不包含完整提示词以避免日志过长）
         logger.info(f"📊 API请求模型: {request_data['model']}")
-        logger.info(f"📏 系统提示词长度: {len(system_prompt)} 字符")
+        logger.info(f"📏 系统提示词长度: {len(PLAN_SYSTEM_PROMPT)} 字符")
         logger.info(f"📏 用户提示词长度: {len(user_prompt)} 字符")
         
         # 步骤4: AI API调用
-        api_call_start = datetime.now()
+        api_call_start = time.monotonic()
         logger.info(f"🌐 正在调用API: {API_URL}")
         
-        response = requests.post(
+        # 流式响应放在with中，提前结束、出错或生成器被中止时都会释放连接
+        with SESSION.post(
             API_URL,
-            headers={"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"},
             json=request_data,
+            stream=True,
             timeout=300  # 优化：生成方案超时时间为300秒（5分钟）
-        )
-        
-        api_call_duration = (datetime.now() - api_call_start).total_seconds()
-        
-        logger.info(f"📈 API响应状态码: {response.status_code}")
-        logger.info(f"⏱️ API调用耗时: {api_call_duration:.2f}秒")
-        
-        if response.status_code == 200:
-            content = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
-            
-            content_length = len(content) if content else 0
-            logger.info(f"📝 生成内容长度: {content_length} 字符")
-            
-            explanation_manager.add_processing_step(
-                stage=ProcessingStage.AI_GENERATION,
-                title="AI内容生成",
-                description="AI模型成功生成开发计划内容",
-                success=bool(content),
-                details={
-                    "响应状态": f"HTTP {response.status_code}",
-                    "生成内容长度": f"{content_length} 字符",
-                    "API调用耗时": f"{api_call_duration:.2f}秒",
-                    "平均生成速度": f"{content_length / api_call_duration:.1f} 字符/秒" if api_call_duration > 0 else "N/A"
-                },
-                duration=api_call_duration,
-                quality_score=90 if content_length > 1000 else 70,
-                evidence=f"成功生成 {content_length} 字符的开发计划内容，包含技术方案和编程提示词"
-            )
-            
-            if content:
-                # 步骤5: 内容后处理
-                postprocess_start = datetime.now()
-                
-                # 后处理：确保内容结构化
-                final_plan_text = format_response(content)
-                
-                # 应用内容验证和修复
-                final_plan_text = validate_and_fix_content(final_plan_text)
-                
-                postprocess_duration = (datetime.now() - postprocess_start).total_seconds()
-                
-                explanation_manager.add_processing_step(
-                    stage=ProcessingStage.CONTENT_FORMATTING,
-                    title="内容后处理",
-                    description="格式化和验证生成的内容",
-                    success=True,
-                    details={
-                        "格式化处理": "Markdown结构优化",
-                        "内容验证": "Mermaid语法修复, 链接检查",
-                        "最终内容长度": f"{len(final_plan_text)} 字符",
-                        "处理耗时": f"{postprocess_duration:.2f}秒"
-                    },
-                    duration=postprocess_duration,
-                    quality_score=85,
-                    evidence=f"完成内容后处理，最终输出 {len(final_plan_text)} 字符的完整开发计划"
-                )
-                
-                # 创建临时文件
-                temp_file = create_temp_markdown_file(final_plan_text)
-                
-                # 如果临时文件创建失败，使用None避免Gradio权限错误
-                if not temp_file:
-                    temp_file = None
-                
-                # 总处理时间
-                total_duration = (datetime.now() - start_time).total_seconds()
-                logger.info(f"🎉 开发计划生成完成，总耗时: {total_duration:.2f}秒")
-                
-                return final_plan_text, extract_prompts_section(final_plan_text), temp_file
-            else:
+        ) as response:
+
+            logger.info(f"📈 API响应状态码: {response.status_code}")
+
+            if response.status_code == 200:
+                # SSE流固定为UTF-8，避免requests按ISO-8859-1解码中文
+                response.encoding = 'utf-8'
+                content_parts = []
+                last_flush = time.monotonic()
+                for delta in iter_stream_content(response):
+                    content_parts.append(delta)
+                    # 合并短时间内到达的片段，限制界面刷新频率，同时减少重复拼接
+                    now = time.monotonic()
+                    if now - last_flush >= STREAM_UPDATE_INTERVAL:
+                        last_flush = now
+                        yield "".join(content_parts), "", None
+                content = "".join(content_parts)
+
+                api_call_duration = time.monotonic() - api_call_start
+                logger.info(f"⏱️ API调用耗时: {api_call_duration:.2f}秒")
+
+                content_length = len(content) if content else 0
+                logger.info(f"📝 生成内容长度: {content_length} 字符")
+
                 explanation_manager.add_processing_step(
                     stage=ProcessingStage.AI_GENERATION,
-                    title="AI生成失败",
-                    description="AI模型返回空内容",
-                    success=False,
+                    title="AI内容生成",
+                    description="AI模型成功生成开发计划内容",
+                    success=bool(content),
                     details={
                         "响应状态": f"HTTP {response.status_code}",
-                        "错误原因": "AI返回空内容"
+                        "生成内容长度": f"{content_length} 字符",
+                        "API调用耗时": f"{api_call_duration:.2f}秒",
+                        "平均生成速度": f"{content_length / api_call_duration:.1f} 字符/秒" if api_call_duration > 0 else "N/A"
                     },
                     duration=api_call_duration,
-                    quality_score=0,
-                    evidence="AI API调用成功但返回空的内容"
+                    quality_score=90 if content_length > 1000 else 70,
+                    evidence=f"成功生成 {content_length} 字符的开发计划内容，包含技术方案和编程提示词"
                 )
-                
-                logger.error("API returned empty content")
-                return "❌ AI返回空内容，请稍后重试", "", None
-        else:
-            # 记录详细的错误信息
-            logger.error(f"API request failed with status {response.status_code}")
-            try:
-                error_detail = response.json()
-                logger.error(f"API错误详情: {error_detail}")
-                error_message = error_detail.get('message', '未知错误')
-                error_code = error_detail.get('code', '')
-                
-                explanation_manager.add_processing_step(
-                    stage=ProcessingStage.AI_GENERATION,
-                    title="AI API调用失败",
-                    description="AI模型API请求失败",
-                    success=False,
-                    details={
-                        "HTTP状态码": response.status_code,
-                        "错误代码": error_code,
-                        "错误消息": error_message
-                    },
-                    duration=api_call_duration,
-                    quality_score=0,
-                    evidence=f"API返回错误: HTTP {response.status_code} - {error_message}"
-                )
-                
-                return f"❌ API请求失败: HTTP {response.status_code} (错误代码: {error_code}) - {error_message}", "", None
-            except:
-                logger.error(f"API响应内容: {response.text[:500]}")
-                
-                explanation_manager.add_processing_step(
-                    stage=ProcessingStage.AI_GENERATION,
-                    title="AI API调用失败",
-                    description="AI模型API请求失败，无法解析错误信息",
-                    success=False,
-                    details={
-                        "HTTP状态码": response.status_code,
-                        "响应内容": response.text[:200]
-                    },
-                    duration=api_call_duration,
-                    quality_score=0,
-                    evidence=f"API请求失败，状态码: {response.status_code}"
-                )
-                
-                return f"❌ API请求失败: HTTP {response.status_code} - {response.text[:200]}", "", None
-            
+
+                if content:
+                    # 步骤5: 内容后处理
+                    postprocess_start = time.monotonic()
+
+                    # 后处理：确保内容结构化
+                    final_plan_text = format_response(content)
+
+                    # 应用内容验证和修复
+                    final_plan_text = validate_and_fix_content(final_plan_text)
+
+                    postprocess_duration = time.monotonic() - postprocess_start
+
+                    explanation_manager.add_processing_step(
+                        stage=ProcessingStage.CONTENT_FORMATTING,
+                        title="内容后处理",
+                        description="格式化和验证生成的内容",
+                        success=True,
+                        details={
+                            "格式化处理": "Markdown结构优化",
+                            "内容验证": "Mermaid语法修复, 链接检查",
+                            "最终内容长度": f"{len(final_plan_text)} 字符",
+                            "处理耗时": f"{postprocess_duration:.2f}秒"
+                        },
+                        duration=postprocess_duration,
+                        quality_score=85,
+                        evidence=f"完成内容后处理，最终输出 {len(final_plan_text)} 字符的完整开发计划"
+                    )
+
+                    # 总处理时间
+                    total_duration = time.monotonic() - start_time
+                    logger.info(f"🎉 开发计划生成完成，总耗时: {total_duration:.2f}秒")
+
+                    prompts_text = extract_prompts_section(final_plan_text)
+                    save_cached_plan(cache_key, final_plan_text, prompts_text)
+
+                    # 下载文件在用户点击下载按钮时才生成
+                    yield final_plan_text, prompts_text, None
+                    return True
+                else:
+                    explanation_manager.add_processing_step(
+                        stage=ProcessingStage.AI_GENERATION,
+                        title="AI生成失败",
+                        description="AI模型返回空内容",
+                        success=False,
+                        details={
+                            "响应状态": f"HTTP {response.status_code}",
+                            "错误原因": "AI返回空内容"
+                        },
+                        duration=api_call_duration,
+                        quality_score=0,
+                        evidence="AI API调用成功但返回空的内容"
+                    )
+
+                    logger.error("API returned empty content")
+                    yield "❌ AI返回空内容，请稍后重试", "", None
+                    return
+            else:
+                api_call_duration = time.monotonic() - api_call_start
+
+                # 记录详细的错误信息
+                logger.error(f"API request failed with status {response.status_code}")
+                try:
+                    error_detail = response.json()
+                    logger.error(f"API错误详情: {error_detail}")
+                    error_message = error_detail.get('message', '未知错误')
+                    error_code = error_detail.get('code', '')
+
+                    explanation_manager.add_processing_step(
+                        stage=ProcessingStage.AI_GENERATION,
+                        title="AI API调用失败",
+                        description="AI模型API请求失败",
+                        success=False,
+                        details={
+                            "HTTP状态码": response.status_code,
+                            "错误代码": error_code,
+                            "错误消息": error_message
+                        },
+                        duration=api_call_duration,
+                        quality_score=0,
+                        evidence=f"API返回错误: HTTP {response.status_code} - {error_message}"
+                    )
+
+                    yield f"❌ API请求失败: HTTP {response.status_code} (错误代码: {error_code}) - {error_message}", "", None
+                    return
+                except:
+                    logger.error(f"API响应内容: {response.text[:500]}")
+
+                    explanation_manager.add_processing_step(
+                        stage=ProcessingStage.AI_GENERATION,
+                        title="AI API调用失败",
+                        description="AI模型API请求失败，无法解析错误信息",
+                        success=False,
+                        details={
+                            "HTTP状态码": response.status_code,
+                            "响应内容": response.text[:200]
+                        },
+                        duration=api_call_duration,
+                        quality_score=0,
+                        evidence=f"API请求失败，状态码: {response.status_code}"
+                    )
+
+                    yield f"❌ API请求失败: HTTP {response.status_code} - {response.text[:200]}", "", None
+                    return
+
     except requests.exceptions.Timeout:
         logger.error("API request timeout")
-        return "❌ API请求超时，请稍后重试", "", None
+        yield "❌ API请求超时，请稍后重试", "", None
+        return
     except requests.exceptions.ConnectionError:
         logger.error("API connection failed")
-        return "❌ 网络连接失败，请检查网络设置", "", None
+        yield "❌ 网络连接失败，请检查网络设置", "", None
+        return
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return f"❌ 处理错误: {str(e)}", "", None
+        yield f"❌ 处理错误: {str(e)}", "", None
+        return
 
 def extract_prompts_section(content: str) -> str:
     """从完整内容中提取AI编程提示词部分"""
@@ -1275,26 +1507,21 @@ def extract_prompts_section(content: str) -> str:
 def create_temp_markdown_file(content: str) -> str:
     """创建临时markdown文件"""
     try:
-        import tempfile
-        import os
-        
         # 创建临时文件，使用更安全的方法
         with tempfile.NamedTemporaryFile(
             mode='w', 
             suffix='.md', 
             delete=False, 
-            encoding='utf-8'
+            encoding='utf-8',
+            buffering=TEMP_FILE_CHUNK_SIZE
         ) as temp_file:
-            temp_file.write(content)
+            # 分块写入，编码时只产生单个块大小的字节副本，而不是整篇方案的副本
+            for offset in range(0, len(content), TEMP_FILE_CHUNK_SIZE):
+                temp_file.write(content[offset:offset + TEMP_FILE_CHUNK_SIZE])
             temp_file_path = temp_file.name
         
-        # 验证文件是否创建成功
-        if os.path.exists(temp_file_path):
-            logger.info(f"✅ 成功创建临时文件: {temp_file_path}")
-            return temp_file_path
-        else:
-            logger.warning("⚠️ 临时文件创建后不存在")
-            return ""
+        logger.info(f"✅ 成功创建临时文件: {temp_file_path}")
+        return temp_file_path
             
     except PermissionError as e:
         logger.error(f"❌ 权限错误，无法创建临时文件: {e}")
@@ -1303,6 +1530,70 @@ def create_temp_markdown_file(content: str) -> str:
         logger.error(f"❌ 创建临时文件失败: {e}")
         return ""
 
+def prepare_download_file(plan_content: str, last_generation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """用户点击下载按钮时才将当前开发计划写入临时文件；只有最近一次生成成功时才提供下载"""
+    if not plan_content or not (last_generation or {}).get("succeeded"):
+        gr.Warning("请先生成开发计划")
+        return gr.update(value=None, visible=False)
+    
+    temp_file = create_temp_markdown_file(plan_content)
+    
+    # 如果临时文件创建失败，使用None避免Gradio权限错误
+    return gr.update(value=temp_file or None, visible=bool(temp_file))
+
+def show_download_info() -> Dict[str, Any]:
+    """显示文档已生成的下载提示"""
+    return gr.update(value=DOWNLOAD_INFO_HTML, visible=True)
+
+def generate_plan_for_ui(
+    user_idea: str,
+    reference_url: str = "",
+    last_generation: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple]:
+    """
+    界面生成入口：流式转发开发计划，并在最后一次输出中一并显示过程详情按钮和下载提示，
+    避免生成结束后再通过多个.then()回调各自往返一次。
+    
+    last_generation为会话级状态，记录本会话上一次成功生成的输入和结果；
+    输入未变化时直接返回上一次的结果，不再重新调用AI。
+    其中succeeded表示当前显示的内容是否为成功生成的方案，下载按钮据此判断是否可下载。
+    """
+    last_generation = last_generation or {}
+    generation_key = ((user_idea or "").strip(), (reference_url or "").strip())
+    
+    if last_generation.get("key") == generation_key and last_generation.get("result"):
+        logger.info("⚡ 输入与上次生成相同，直接复用本会话的结果")
+        last_generation = {**last_generation, "succeeded": True}
+        yield (*last_generation["result"], gr.update(visible=True), show_download_info(), last_generation)
+        return
+    
+    # 生成过程中界面显示的是未完成的内容，暂不允许下载
+    last_generation = {**last_generation, "succeeded": False}
+    plan_stream = generate_development_plan(user_idea, reference_url)
+    result = None
+    succeeded = False
+    while True:
+        try:
+            next_result = next(plan_stream)
+        except StopIteration as stop:
+            # 生成器的返回值明确表示是否成功，不依赖错误提示的文本格式
+            succeeded = bool(stop.value)
+            break
+        if result is not None:
+            yield (*result, gr.update(), gr.update(), last_generation)
+        result = next_result
+    
+    if result is not None:
+        # 只记住成功的结果，失败后再次点击仍会重新生成
+        if succeeded:
+            last_generation = {"key": generation_key, "result": result, "succeeded": True}
+        yield (
+            *result,
+            gr.update(visible=True),
+            show_download_info() if succeeded else gr.update(),
+            last_generation
+        )
+
 def enable_plan_editing(plan_content: str) -> Tuple[str, str]:
     """启用方案编辑功能"""
     try:
@@ -1337,9 +1628,8 @@ def enable_plan_editing(plan_content: str) -> Tuple[str, str]:
         logger.error(f"启用编辑失败: {str(e)}")
         return "", f"❌ 启用编辑失败: {str(e)}"
 
-def generate_edit_interface(editable_sections: List[Dict]) -> str:
-    """生成编辑界面HTML"""
-    interface_html = """
+# 分段编辑器的固定头部和尾部（含编辑脚本）只构建一次，每次只拼接段落部分
+EDIT_INTERFACE_HEADER_HTML = """
 <div class="plan-editor-container">
     <div class="editor-header">
         <h3>📝 分段编辑器</h3>
@@ -1348,27 +1638,8 @@ def generate_edit_interface(editable_sections: List[Dict]) -> str:
     
     <div class="sections-container">
 """
-    
-    for section in editable_sections:
-        section_html = f"""
-        <div class="editable-section" data-section-id="{section['id']}" data-section-type="{section['type']}">
-            <div class="section-header">
-                <span class="section-type">{get_section_type_emoji(section['type'])}</span>
-                <span class="section-title">{section['title']}</span>
-                <button class="edit-section-btn" onclick="editSection('{section['id']}')">
-                    ✏️ 编辑
-                </button>
-            </div>
-            
-            <div class="section-preview">
-                <div class="preview-content">{section['preview']}</div>
-                <div class="section-content" style="display: none;">{_html_escape(section['content'])}</div>
-            </div>
-        </div>
-"""
-        interface_html += section_html
-    
-    interface_html += """
+
+EDIT_INTERFACE_FOOTER_HTML = """
     </div>
     
     <div class="editor-actions">
@@ -1575,8 +1846,29 @@ style.textContent = `
 document.head.appendChild(style);
 </script>
 """
+
+def generate_edit_interface(editable_sections: List[Dict]) -> str:
+    """生成编辑界面HTML"""
+    section_blocks = [f"""
+        <div class="editable-section" data-section-id="{section['id']}" data-section-type="{section['type']}">
+            <div class="section-header">
+                <span class="section-type">{get_section_type_emoji(section['type'])}</span>
+                <span class="section-title">{section['title']}</span>
+                <button class="edit-section-btn" onclick="editSection('{section['id']}')">
+                    ✏️ 编辑
+                </button>
+            </div>
+            
+            <div class="section-preview">
+                <div class="preview-content">{section['preview']}</div>
+                <div class="section-content" style="display: none;">{_html_escape(section['content'])}</div>
+            </div>
+        </div>
+"""
+        for section in editable_sections
+    ]
     
-    return interface_html
+    return EDIT_INTERFACE_HEADER_HTML + "".join(section_blocks) + EDIT_INTERFACE_FOOTER_HTML
 
 def _html_escape(text: str) -> str:
     """HTML转义函数"""
@@ -1624,15 +1916,15 @@ def get_edit_history() -> str:
         if not history:
             return "暂无编辑历史"
         
-        history_html = """
+        history_parts = ["""
 <div class="edit-history">
     <h3>📜 编辑历史</h3>
     <div class="history-list">
-"""
+"""]
         
         for i, edit in enumerate(reversed(history[-10:]), 1):  # 显示最近10次编辑
             timestamp = datetime.fromisoformat(edit['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-            history_html += f"""
+            history_parts.append(f"""
             <div class="history-item">
                 <div class="history-header">
                     <span class="history-index">#{i}</span>
@@ -1641,14 +1933,14 @@ def get_edit_history() -> str:
                 </div>
                 <div class="history-comment">{edit['user_comment'] or '无说明'}</div>
             </div>
-"""
+""")
         
-        history_html += """
+        history_parts.append("""
     </div>
 </div>
-"""
+""")
         
-        return history_html
+        return "".join(history_parts)
         
     except Exception as e:
         logger.error(f"获取编辑历史失败: {str(e)}")
@@ -1690,6 +1982,27 @@ def fix_links_for_new_window(content: str) -> str:
     
     return content
 
+# 开发计划标题区域模板 - 只有生成时间会变化，其余部分预先构建
+PLAN_HEADER_TEMPLATE = """
+<div class="plan-header">
+
+# 🚀 AI生成的开发计划
+
+<div class="meta-info">
+
+**⏰ 生成时间：** {timestamp}  
+**🤖 AI模型：** Qwen2.5-72B-Instruct  
+**💡 基于用户创意智能分析生成**  
+**🔗 Agent应用MCP服务增强**
+
+</div>
+
+</div>
+
+---
+
+"""
+
 def format_response(content: str) -> str:
     """格式化AI回复，美化显示并保持原始AI生成的提示词"""
     
@@ -1710,52 +2023,16 @@ def format_response(content: str) -> str:
         # 美化AI编程提示词部分
         enhanced_prompts = enhance_prompts_display(prompts_content)
         
-        formatted_content = f"""
-<div class="plan-header">
-
-# 🚀 AI生成的开发计划
-
-<div class="meta-info">
-
-**⏰ 生成时间：** {timestamp}  
-**🤖 AI模型：** Qwen2.5-72B-Instruct  
-**💡 基于用户创意智能分析生成**  
-**🔗 Agent应用MCP服务增强**
-
-</div>
-
-</div>
-
----
-
-{enhance_markdown_structure(plan_content)}
-
----
-
-{enhanced_prompts}
-"""
+        formatted_content = (
+            PLAN_HEADER_TEMPLATE.format(timestamp=timestamp)
+            + f"{enhance_markdown_structure(plan_content)}\n\n---\n\n{enhanced_prompts}\n"
+        )
     else:
         # 没有明确分割，使用原始内容
-        formatted_content = f"""
-<div class="plan-header">
-
-# 🚀 AI生成的开发计划
-
-<div class="meta-info">
-
-**⏰ 生成时间：** {timestamp}  
-**🤖 AI模型：** Qwen2.5-72B-Instruct  
-**💡 基于用户创意智能分析生成**  
-**🔗 Agent应用MCP服务增强**
-
-</div>
-
-</div>
-
----
-
-{enhance_markdown_structure(content)}
-"""
+        formatted_content = (
+            PLAN_HEADER_TEMPLATE.format(timestamp=timestamp)
+            + f"{enhance_markdown_structure(content)}\n"
+        )
     
     return formatted_content
 
@@ -1812,11 +2089,13 @@ def enhance_prompts_display(prompts_content: str) -> str:
 
 def extract_prompts_section(content: str) -> str:
     """从完整内容中提取AI编程提示词部分"""
-    # 分割内容，查找AI编程提示词部分
-    parts = content.split('# AI编程助手提示词')
+    # 定位AI编程提示词部分，只截取该段而不是复制拆分整篇内容
+    marker = '# AI编程助手提示词'
+    start = content.find(marker)
     
-    if len(parts) >= 2:
-        prompts_content = '# AI编程助手提示词' + parts[1]
+    if start != -1:
+        end = content.find(marker, start + len(marker))
+        prompts_content = content[start:end] if end != -1 else content[start:]
         # 清理和格式化提示词内容，移除HTML标签以便复制
         clean_prompts = clean_prompts_for_copy(prompts_content)
         return clean_prompts
@@ -1855,6 +2134,11 @@ def clean_prompts_for_copy(prompts_content: str) -> str:
     return '\n'.join(cleaned_lines)
 
 # 删除多余的旧代码，这里应该是enhance_markdown_structure函数
+# Markdown结构增强规则 - 关键词合并为一个预编译正则，集合与前缀元组只构建一次
+MARKDOWN_H1_KEYWORD_PATTERN = re.compile("产品概述|技术方案|开发计划|部署方案|推广策略|AI|编程助手|提示词")
+MARKDOWN_FEATURE_PREFIXES = ('主要功能', '目标用户')
+MARKDOWN_TECH_STACK_HEADINGS = frozenset(('前端', '后端', 'AI 模型', '工具和库'))
+
 def enhance_markdown_structure(content: str) -> str:
     """增强Markdown结构，添加视觉亮点和层级"""
     lines = content.split('\n')
@@ -1865,7 +2149,7 @@ def enhance_markdown_structure(content: str) -> str:
         
         # 增强一级标题
         if stripped and not stripped.startswith('#') and len(stripped) < 50 and '：' not in stripped and '.' not in stripped[:5]:
-            if any(keyword in stripped for keyword in ['产品概述', '技术方案', '开发计划', '部署方案', '推广策略', 'AI', '编程助手', '提示词']):
+            if MARKDOWN_H1_KEYWORD_PATTERN.search(stripped):
                 enhanced_lines.append(f"\n## 🎯 {stripped}\n")
                 continue
         
@@ -1876,12 +2160,12 @@ def enhance_markdown_structure(content: str) -> str:
                 continue
                 
         # 增强功能列表
-        if stripped.startswith('主要功能') or stripped.startswith('目标用户'):
+        if stripped.startswith(MARKDOWN_FEATURE_PREFIXES):
             enhanced_lines.append(f"\n#### 🔹 {stripped}\n")
             continue
             
         # 增强技术栈部分
-        if stripped in ['前端', '后端', 'AI 模型', '工具和库']:
+        if stripped in MARKDOWN_TECH_STACK_HEADINGS:
             enhanced_lines.append(f"\n#### 🛠️ {stripped}\n")
             continue
             
@@ -3490,405 +3774,193 @@ details.gr-accordion:not([open]) {
 }
 """
 
+# 静态界面内容 - 模块加载时构建一次，界面构建时直接引用
+ENABLED_MCP_NAMES = tuple(service.name for service in config.get_enabled_mcp_services())
+
+# 页面顶部标题区域
+HEADER_HTML = """
+<div class="header-gradient">
+    <h1>🚀 VibeDoc - AI-Powered Development Plan Generator</h1>
+    <p style="font-size: 18px; margin: 15px 0; opacity: 0.95;">
+        🤖 Transform your ideas into comprehensive development plans in 60-180 seconds
+    </p>
+    <p style="opacity: 0.85;">
+        ✨ AI-Driven Planning | � Visual Diagrams | 🎯 Professional Output | � Multi-format Export
+    </p>
+    <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(255,255,255,0.1); border-radius: 0.5rem;">
+        <small style="opacity: 0.9;">
+            🌟 Open Source Project | 💡 Built with Qwen2.5-72B-Instruct | ⚡ Fast & Reliable
+        </small>
+    </div>
+</div>
+"""
+
+# 右侧使用提示卡片
+TIPS_HTML = """
+<div class="tips-box">
+    <h4 style="color: #e53e3e;">💡 简单三步</h4>
+    <div style="font-size: 16px; font-weight: 600; text-align: center; margin: 20px 0;">
+        <span style="color: #e53e3e;">创意描述</span> → 
+        <span style="color: #38a169;">智能分析</span> → 
+        <span style="color: #3182ce;">完整方案</span>
+    </div>
+    <h4 style="color: #38a169;">🎯 核心功能</h4>
+    <ul>
+        <li><span style="color: #e53e3e;">📋</span> 完整开发计划</li>
+        <li><span style="color: #3182ce;">🤖</span> AI编程提示词</li>
+        <li><span style="color: #38a169;">�</span> 可视化图表</li>
+        <li><span style="color: #d69e2e;">🔗</span> MCP服务增强</li>
+    </ul>
+    <h4 style="color: #3182ce;">⏱️ 生成时间</h4>
+    <ul>
+        <li><span style="color: #e53e3e;">✨</span> 创意优化：20秒</li>
+        <li><span style="color: #38a169;">📝</span> 方案生成：150-200秒</li>
+        <li><span style="color: #d69e2e;">⚡</span> 一键复制下载</li>
+    </ul>
+</div>
+"""
+
+# 开发计划区域的初始占位内容
+PLAN_PLACEHOLDER_HTML = """
+<div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%); border-radius: 1rem; border: 2px dashed #cbd5e0;">
+    <div style="font-size: 3rem; margin-bottom: 1rem;">🤖</div>
+    <h3 style="color: #2b6cb0; margin-bottom: 1rem; font-weight: bold;">智能开发计划生成</h3>
+    <p style="color: #4a5568; font-size: 1.1rem; margin-bottom: 1.5rem;">
+        💭 <strong style="color: #e53e3e;">输入创意，获得完整开发方案</strong>
+    </p>
+    <div style="background: linear-gradient(90deg, #edf2f7 0%, #e6fffa 100%); padding: 1rem; border-radius: 0.5rem; margin: 1rem 0; border-left: 4px solid #38b2ac;">
+        <p style="color: #2c7a7b; margin: 0; font-weight: 600;">
+            🎯 <span style="color: #e53e3e;">技术方案</span> • <span style="color: #38a169;">开发计划</span> • <span style="color: #3182ce;">编程提示词</span>
+        </p>
+    </div>
+    <p style="color: #a0aec0; font-size: 0.9rem;">
+        点击 <span style="color: #e53e3e; font-weight: bold;">"🤖 AI生成开发计划"</span> 按钮开始
+    </p>
+</div>
+"""
+
+# 复制/下载按钮下方的使用提示
+USAGE_TIPS_HTML = """
+<div style="padding: 10px; background: #e3f2fd; border-radius: 8px; text-align: center; color: #1565c0;" id="usage_tips">
+    💡 点击上方按钮复制内容，或下载保存为文件
+</div>
+"""
+
+# 使用说明 - 功能介绍
+HOW_IT_WORKS_HTML = """
+<div class="prompts-section" id="ai_helper_instructions">
+    <h3>🚀 How It Works - Intelligent Development Planning</h3>
+
+    <!-- 核心功能 -->
+    <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #e8f5e8 0%, #f0fff4 100%); border-radius: 15px; border: 3px solid #28a745; margin: 15px 0;">
+        <span style="font-size: 36px;">🧠</span><br>
+        <strong style="font-size: 18px; color: #155724;">AI-Powered Analysis</strong><br>
+        <small style="color: #155724; font-weight: 600; font-size: 13px;">
+            � Intelligent planning • ⚡ Fast generation • ✅ Professional output
+        </small>
+    </div>
+
+    <!-- 可视化支持 -->
+    <div style="text-align: center; padding: 15px; background: linear-gradient(135deg, #e3f2fd 0%, #f0f8ff 100%); border-radius: 12px; border: 2px solid #2196f3; margin: 15px 0;">
+        <span style="font-size: 30px;">�</span><br>
+        <strong style="font-size: 16px; color: #1976d2;">Visual Diagrams</strong><br>
+        <small style="color: #1976d2; font-weight: 600; font-size: 12px;">
+            🎨 Architecture • � Flowcharts • 📅 Gantt charts
+        </small>
+    </div>
+
+    <!-- 处理流程说明 -->
+    <div style="background: linear-gradient(135deg, #fff3e0 0%, #fffaf0 100%); padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #ff9800;">
+        <strong style="color: #f57c00;">⚡ Processing Pipeline:</strong>
+        <ol style="margin: 10px 0; padding-left: 20px; font-size: 14px;">
+            <li><strong>Input Analysis</strong> → Understanding your requirements</li>
+            <li><strong>Prompt Optimization</strong> → Enhancing description quality</li>
+            <li><strong>Knowledge Retrieval</strong> → Fetching relevant information</li>
+            <li><strong>AI Generation</strong> → Creating comprehensive plan</li>
+            <li><strong>Quality Validation</strong> → Ensuring professional output</li>
+        </ol>
+    </div>
+
+    <!-- 核心优势 -->
+    <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #6c757d;">
+        <strong style="color: #495057;">🎯 Key Advantages:</strong>
+        <ul style="margin: 10px 0; padding-left: 20px; font-size: 14px;">
+            <li><strong>Speed</strong> → 60-180 seconds generation time</li>
+            <li><strong>Quality</strong> → Professional industry-standard output</li>
+            <li><strong>Flexibility</strong> → Multiple export formats</li>
+            <li><strong>Integration</strong> → Works with all AI coding assistants</li>
+        </ul>
+    </div>
+
+    <h4>🤖 Perfect for AI Coding Assistants</h4>
+    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 6px; margin: 12px 0;">
+        <div style="text-align: center; padding: 8px; background: #e3f2fd; border-radius: 6px; border: 1px solid #2196f3; box-shadow: 0 2px 4px rgba(33,150,243,0.2);">
+            <span style="font-size: 16px;">🔵</span> <strong style="font-size: 12px;">Claude</strong>
+        </div>
+        <div style="text-align: center; padding: 8px; background: #e8f5e8; border-radius: 6px; border: 1px solid #4caf50; box-shadow: 0 2px 4px rgba(76,175,80,0.2);">
+            <span style="font-size: 16px;">🟢</span> <strong style="font-size: 12px;">GitHub Copilot</strong>
+        </div>
+        <div style="text-align: center; padding: 8px; background: #fff3e0; border-radius: 6px; border: 1px solid #ff9800; box-shadow: 0 2px 4px rgba(255,152,0,0.2);">
+            <span style="font-size: 16px;">🟡</span> <strong style="font-size: 12px;">ChatGPT</strong>
+        </div>
+        <div style="text-align: center; padding: 8px; background: #fce4ec; border-radius: 6px; border: 1px solid #e91e63; box-shadow: 0 2px 4px rgba(233,30,99,0.2);">
+            <span style="font-size: 16px;">🔴</span> <strong style="font-size: 12px;">Cursor</strong>
+        </div>
+    </div>
+    <p style="text-align: center; color: #28a745; font-weight: 700; font-size: 15px; background: #d4edda; padding: 8px; border-radius: 8px; border: 1px solid #c3e6cb;">
+        <em>🎉 Professional Development Plans + Ready-to-Use AI Prompts</em>
+    </p>
+</div>
+"""
+
+# 计划生成完成后的下载提示
+DOWNLOAD_INFO_HTML = """
+<div style="padding: 10px; background: #e8f5e8; border-radius: 8px; text-align: center; margin: 10px 0; color: #2d5a2d;" id="download_success_info">
+    ✅ <strong style="color: #1a5a1a;">文档已生成！</strong> 您现在可以：
+    <br>• 📋 <span style="color: #2d5a2d;">复制开发计划或编程提示词</span>
+    <br>• 📁 <span style="color: #2d5a2d;">点击"📁 生成下载文件"保存文档</span>
+    <br>• 🔄 <span style="color: #2d5a2d;">调整创意重新生成</span>
+</div>
+"""
+
+# 示例用例 - 创意描述与参考链接
+EXAMPLES = [
+    [
+        "AI-powered customer service system: Multi-turn dialogue, sentiment analysis, knowledge base search, automatic ticket generation, and intelligent responses",
+        "https://docs.python.org/3/library/asyncio.html"
+    ],
+    [
+        "Modern web application with React and TypeScript: User authentication, real-time data sync, responsive design, PWA support, and offline capabilities",
+        "https://react.dev/learn"
+    ],
+    [
+        "Task management platform: Team collaboration, project tracking, deadline reminders, file sharing, and progress visualization",
+        ""
+    ],
+    [
+        "E-commerce marketplace: Product catalog, shopping cart, payment integration, order management, and customer reviews",
+        "https://developer.mozilla.org/en-US/docs/Web/Progressive_web_apps"
+    ],
+    [
+        "Social media analytics dashboard: Data visualization, sentiment analysis, trend tracking, engagement metrics, and automated reporting",
+        ""
+    ],
+    [
+        "Educational learning management system: Course creation, student enrollment, progress tracking, assessments, and certificates",
+        "https://www.w3.org/WAI/WCAG21/quickref/"
+    ]
+]
+
 # 保持美化的Gradio界面
 with gr.Blocks(
     title="VibeDoc Agent：您的随身AI产品经理与架构师",
     theme=gr.themes.Soft(primary_hue="blue"),
-    css=custom_css
+    css=custom_css,
+    head=FRONTEND_HEAD_HTML,
+    analytics_enabled=False  # 不在启动时向外发送统计请求
 ) as demo:
     
-    gr.HTML("""
-    <div class="header-gradient">
-        <h1>🚀 VibeDoc - AI-Powered Development Plan Generator</h1>
-        <p style="font-size: 18px; margin: 15px 0; opacity: 0.95;">
-            🤖 Transform your ideas into comprehensive development plans in 60-180 seconds
-        </p>
-        <p style="opacity: 0.85;">
-            ✨ AI-Driven Planning | � Visual Diagrams | 🎯 Professional Output | � Multi-format Export
-        </p>
-        <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(255,255,255,0.1); border-radius: 0.5rem;">
-            <small style="opacity: 0.9;">
-                🌟 Open Source Project | 💡 Built with Qwen2.5-72B-Instruct | ⚡ Fast & Reliable
-            </small>
-        </div>
-    </div>
-    
-    <!-- 添加Mermaid.js支持 -->
-    <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
-    <script>
-        // 增强的Mermaid配置
-        mermaid.initialize({ 
-            startOnLoad: true,
-            theme: 'default',
-            flowchart: {
-                useMaxWidth: true,
-                htmlLabels: true,
-                curve: 'basis'
-            },
-            gantt: {
-                useMaxWidth: true,
-                gridLineStartPadding: 350,
-                fontSize: 13,
-                fontFamily: '"Inter", "Source Sans Pro", sans-serif',
-                sectionFontSize: 24,
-                numberSectionStyles: 4
-            },
-            themeVariables: {
-                primaryColor: '#3b82f6',
-                primaryTextColor: '#1f2937',
-                primaryBorderColor: '#1d4ed8',
-                lineColor: '#6b7280',
-                secondaryColor: '#dbeafe',
-                tertiaryColor: '#f8fafc',
-                background: '#ffffff',
-                mainBkg: '#ffffff',
-                secondBkg: '#f1f5f9',
-                tertiaryBkg: '#eff6ff'
-            }
-        });
-        
-        // 监听主题变化，动态更新Mermaid主题
-        function updateMermaidTheme() {
-            const isDark = document.documentElement.classList.contains('dark');
-            const theme = isDark ? 'dark' : 'default';
-            mermaid.initialize({ 
-                startOnLoad: true,
-                theme: theme,
-                flowchart: {
-                    useMaxWidth: true,
-                    htmlLabels: true,
-                    curve: 'basis'
-                },
-                gantt: {
-                    useMaxWidth: true,
-                    gridLineStartPadding: 350,
-                    fontSize: 13,
-                    fontFamily: '"Inter", "Source Sans Pro", sans-serif',
-                    sectionFontSize: 24,
-                    numberSectionStyles: 4
-                },
-                themeVariables: isDark ? {
-                    primaryColor: '#60a5fa',
-                    primaryTextColor: '#f8fafc',
-                    primaryBorderColor: '#3b82f6',
-                    lineColor: '#94a3b8',
-                    secondaryColor: '#1e293b',
-                    tertiaryColor: '#0f172a',
-                    background: '#1f2937',
-                    mainBkg: '#1f2937',
-                    secondBkg: '#374151',
-                    tertiaryBkg: '#1e293b'
-                } : {
-                    primaryColor: '#3b82f6',
-                    primaryTextColor: '#1f2937',
-                    primaryBorderColor: '#1d4ed8',
-                    lineColor: '#6b7280',
-                    secondaryColor: '#dbeafe',
-                    tertiaryColor: '#f8fafc',
-                    background: '#ffffff',
-                    mainBkg: '#ffffff',
-                    secondBkg: '#f1f5f9',
-                    tertiaryBkg: '#eff6ff'
-                }
-            });
-            
-            // 重新渲染所有Mermaid图表
-            renderMermaidCharts();
-        }
-        
-        // 强化的Mermaid图表渲染函数
-        function renderMermaidCharts() {
-            try {
-                // 清除现有的渲染内容
-                document.querySelectorAll('.mermaid').forEach(element => {
-                    if (element.getAttribute('data-processed') !== 'true') {
-                        element.removeAttribute('data-processed');
-                    }
-                });
-                
-                // 处理包装器中的Mermaid内容
-                document.querySelectorAll('.mermaid-render').forEach(element => {
-                    const content = element.textContent.trim();
-                    if (content && !element.classList.contains('rendered')) {
-                        element.innerHTML = content;
-                        element.classList.add('mermaid', 'rendered');
-                    }
-                });
-                
-                // 重新初始化Mermaid
-                mermaid.init(undefined, document.querySelectorAll('.mermaid:not([data-processed="true"])'));
-                
-            } catch (error) {
-                console.warn('Mermaid渲染警告:', error);
-                // 如果渲染失败，显示错误信息
-                document.querySelectorAll('.mermaid-render').forEach(element => {
-                    if (!element.classList.contains('rendered')) {
-                        element.innerHTML = '<div class="mermaid-error">图表渲染中，请稍候...</div>';
-                    }
-                });
-            }
-        }
-        
-        // 页面加载完成后初始化
-        document.addEventListener('DOMContentLoaded', function() {
-            setTimeout(renderMermaidCharts, 1000);
-        });
-        
-        // 监听内容变化，自动重新渲染图表
-        function observeContentChanges() {
-            const observer = new MutationObserver(function(mutations) {
-                let shouldRender = false;
-                mutations.forEach(function(mutation) {
-                    if (mutation.type === 'childList') {
-                        mutation.addedNodes.forEach(function(node) {
-                            if (node.nodeType === Node.ELEMENT_NODE) {
-                                if (node.classList && (node.classList.contains('mermaid') || node.querySelector('.mermaid'))) {
-                                    shouldRender = true;
-                                }
-                            }
-                        });
-                    }
-                });
-                
-                if (shouldRender) {
-                    setTimeout(renderMermaidCharts, 500);
-                }
-            });
-            
-            observer.observe(document.body, {
-                childList: true,
-                subtree: true
-            });
-        }
-        
-        // 启动内容观察器
-        observeContentChanges();
-        
-        // 单独复制提示词功能
-        function copyIndividualPrompt(promptId, promptContent) {
-            // 解码HTML实体
-            const decodedContent = promptContent.replace(/\\n/g, '\n').replace(/\\'/g, "'").replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&');
-            
-            if (navigator.clipboard && window.isSecureContext) {
-                navigator.clipboard.writeText(decodedContent).then(() => {
-                    showCopySuccess(promptId);
-                }).catch(err => {
-                    console.error('复制失败:', err);
-                    fallbackCopy(decodedContent);
-                });
-            } else {
-                fallbackCopy(decodedContent);
-            }
-        }
-        
-        // 编辑提示词功能
-        function editIndividualPrompt(promptId, promptContent) {
-            // 解码HTML实体
-            const decodedContent = promptContent.replace(/\\n/g, '\n').replace(/\\'/g, "'").replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&');
-            
-            // 检测当前主题
-            const isDark = document.documentElement.classList.contains('dark');
-            
-            // 创建编辑对话框
-            const editDialog = document.createElement('div');
-            editDialog.style.cssText = `
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background: rgba(0, 0, 0, 0.5);
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                z-index: 10000;
-            `;
-            
-            editDialog.innerHTML = `
-                <div style="
-                    background: ${isDark ? '#2d3748' : 'white'};
-                    color: ${isDark ? '#f7fafc' : '#2d3748'};
-                    padding: 2rem;
-                    border-radius: 1rem;
-                    max-width: 80%;
-                    max-height: 80%;
-                    overflow-y: auto;
-                    box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-                ">
-                    <h3 style="margin-bottom: 1rem; color: ${isDark ? '#f7fafc' : '#2d3748'};">✏️ 编辑提示词</h3>
-                    <textarea
-                        id="prompt-editor-${promptId}"
-                        style="
-                            width: 100%;
-                            height: 300px;
-                            padding: 1rem;
-                            border: 2px solid ${isDark ? '#4a5568' : '#e2e8f0'};
-                            border-radius: 0.5rem;
-                            font-family: 'Fira Code', monospace;
-                            font-size: 0.9rem;
-                            resize: vertical;
-                            line-height: 1.5;
-                            background: ${isDark ? '#1a202c' : 'white'};
-                            color: ${isDark ? '#f7fafc' : '#2d3748'};
-                        "
-                        placeholder="在此编辑您的提示词..."
-                    >${decodedContent}</textarea>
-                    <div style="margin-top: 1rem; display: flex; gap: 1rem; justify-content: flex-end;">
-                        <button
-                            id="cancel-edit-${promptId}"
-                            style="
-                                padding: 0.5rem 1rem;
-                                border: 1px solid ${isDark ? '#4a5568' : '#cbd5e0'};
-                                background: ${isDark ? '#2d3748' : 'white'};
-                                color: ${isDark ? '#f7fafc' : '#4a5568'};
-                                border-radius: 0.5rem;
-                                cursor: pointer;
-                                transition: all 0.2s ease;
-                            "
-                        >取消</button>
-                        <button
-                            id="save-edit-${promptId}"
-                            style="
-                                padding: 0.5rem 1rem;
-                                background: linear-gradient(45deg, #667eea, #764ba2);
-                                color: white;
-                                border: none;
-                                border-radius: 0.5rem;
-                                cursor: pointer;
-                                transition: all 0.2s ease;
-                            "
-                        >保存并复制</button>
-                    </div>
-                </div>
-            `;
-            
-            document.body.appendChild(editDialog);
-            
-            // 绑定按钮事件
-            document.getElementById(`cancel-edit-${promptId}`).addEventListener('click', () => {
-                document.body.removeChild(editDialog);
-            });
-            
-            document.getElementById(`save-edit-${promptId}`).addEventListener('click', () => {
-                const editedContent = document.getElementById(`prompt-editor-${promptId}`).value;
-                
-                // 复制编辑后的内容
-                if (navigator.clipboard && window.isSecureContext) {
-                    navigator.clipboard.writeText(editedContent).then(() => {
-                        showCopySuccess(promptId);
-                        document.body.removeChild(editDialog);
-                    }).catch(err => {
-                        console.error('复制失败:', err);
-                        fallbackCopy(editedContent);
-                        document.body.removeChild(editDialog);
-                    });
-                } else {
-                    fallbackCopy(editedContent);
-                    document.body.removeChild(editDialog);
-                }
-            });
-            
-            // ESC键关闭
-            const escapeHandler = (e) => {
-                if (e.key === 'Escape') {
-                    document.body.removeChild(editDialog);
-                    document.removeEventListener('keydown', escapeHandler);
-                }
-            };
-            document.addEventListener('keydown', escapeHandler);
-            
-            // 点击外部关闭
-            editDialog.addEventListener('click', (e) => {
-                if (e.target === editDialog) {
-                    document.body.removeChild(editDialog);
-                    document.removeEventListener('keydown', escapeHandler);
-                }
-            });
-        }
-        
-        // 降级复制方案
-        function fallbackCopy(text) {
-            const textArea = document.createElement('textarea');
-            textArea.value = text;
-            document.body.appendChild(textArea);
-            textArea.select();
-            try {
-                document.execCommand('copy');
-                alert('✅ 提示词已复制到剪贴板！');
-            } catch (err) {
-                alert('❌ 复制失败，请手动选择文本复制');
-            }
-            document.body.removeChild(textArea);
-        }
-        
-        // 显示复制成功提示
-        function showCopySuccess(promptId) {
-            const successMsg = document.getElementById('copy-success-' + promptId);
-            if (successMsg) {
-                successMsg.style.display = 'inline';
-                setTimeout(() => {
-                    successMsg.style.display = 'none';
-                }, 2000);
-            }
-        }
-        
-        // 绑定复制和编辑按钮事件
-        function bindCopyButtons() {
-            document.querySelectorAll('.individual-copy-btn').forEach(button => {
-                button.addEventListener('click', function() {
-                    const promptId = this.getAttribute('data-prompt-id');
-                    const promptContent = this.getAttribute('data-prompt-content');
-                    copyIndividualPrompt(promptId, promptContent);
-                });
-            });
-            
-            document.querySelectorAll('.edit-prompt-btn').forEach(button => {
-                button.addEventListener('click', function() {
-                    const promptId = this.getAttribute('data-prompt-id');
-                    const promptContent = this.getAttribute('data-prompt-content');
-                    editIndividualPrompt(promptId, promptContent);
-                });
-            });
-        }
-        
-        // 页面加载完成后初始化
-        document.addEventListener('DOMContentLoaded', function() {
-            updateMermaidTheme();
-            bindCopyButtons();
-            
-            // 监听主题切换
-            const observer = new MutationObserver(function(mutations) {
-                mutations.forEach(function(mutation) {
-                    if (mutation.type === 'attributes' && mutation.attributeName === 'class') {
-                        updateMermaidTheme();
-                        // 重新渲染所有Mermaid图表
-                        setTimeout(() => {
-                            document.querySelectorAll('.mermaid').forEach(element => {
-                                mermaid.init(undefined, element);
-                            });
-                        }, 100);
-                    }
-                });
-            });
-            observer.observe(document.documentElement, { attributes: true });
-            
-            // 监听内容变化，重新绑定复制按钮
-            const contentObserver = new MutationObserver(function(mutations) {
-                mutations.forEach(function(mutation) {
-                    if (mutation.type === 'childList') {
-                        bindCopyButtons();
-                    }
-                });
-            });
-            
-            // 监听plan_result区域的变化
-            const planResult = document.getElementById('plan_result');
-            if (planResult) {
-                contentObserver.observe(planResult, { childList: true, subtree: true });
-            }
-        });
-    </script>
-    """)
+    gr.HTML(HEADER_HTML)
     
     with gr.Row():
         with gr.Column(scale=2, elem_classes="content-card"):
@@ -3937,50 +4009,12 @@ with gr.Blocks(
             )
         
         with gr.Column(scale=1):
-            gr.HTML("""
-            <div class="tips-box">
-                <h4 style="color: #e53e3e;">💡 简单三步</h4>
-                <div style="font-size: 16px; font-weight: 600; text-align: center; margin: 20px 0;">
-                    <span style="color: #e53e3e;">创意描述</span> → 
-                    <span style="color: #38a169;">智能分析</span> → 
-                    <span style="color: #3182ce;">完整方案</span>
-                </div>
-                <h4 style="color: #38a169;">🎯 核心功能</h4>
-                <ul>
-                    <li><span style="color: #e53e3e;">📋</span> 完整开发计划</li>
-                    <li><span style="color: #3182ce;">🤖</span> AI编程提示词</li>
-                    <li><span style="color: #38a169;">�</span> 可视化图表</li>
-                    <li><span style="color: #d69e2e;">🔗</span> MCP服务增强</li>
-                </ul>
-                <h4 style="color: #3182ce;">⏱️ 生成时间</h4>
-                <ul>
-                    <li><span style="color: #e53e3e;">✨</span> 创意优化：20秒</li>
-                    <li><span style="color: #38a169;">📝</span> 方案生成：150-200秒</li>
-                    <li><span style="color: #d69e2e;">⚡</span> 一键复制下载</li>
-                </ul>
-            </div>
-            """)
+            gr.HTML(TIPS_HTML)
     
     # 结果显示区域
     with gr.Column(elem_classes="result-container"):
         plan_output = gr.Markdown(
-            value="""
-<div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%); border-radius: 1rem; border: 2px dashed #cbd5e0;">
-    <div style="font-size: 3rem; margin-bottom: 1rem;">🤖</div>
-    <h3 style="color: #2b6cb0; margin-bottom: 1rem; font-weight: bold;">智能开发计划生成</h3>
-    <p style="color: #4a5568; font-size: 1.1rem; margin-bottom: 1.5rem;">
-        💭 <strong style="color: #e53e3e;">输入创意，获得完整开发方案</strong>
-    </p>
-    <div style="background: linear-gradient(90deg, #edf2f7 0%, #e6fffa 100%); padding: 1rem; border-radius: 0.5rem; margin: 1rem 0; border-left: 4px solid #38b2ac;">
-        <p style="color: #2c7a7b; margin: 0; font-weight: 600;">
-            🎯 <span style="color: #e53e3e;">技术方案</span> • <span style="color: #38a169;">开发计划</span> • <span style="color: #3182ce;">编程提示词</span>
-        </p>
-    </div>
-    <p style="color: #a0aec0; font-size: 0.9rem;">
-        点击 <span style="color: #e53e3e; font-weight: bold;">"🤖 AI生成开发计划"</span> 按钮开始
-    </p>
-</div>
-            """,
+            value=PLAN_PLACEHOLDER_HTML,
             elem_id="plan_result",
             label="AI生成的开发计划"
         )
@@ -4010,6 +4044,7 @@ with gr.Blocks(
         
         # 隐藏的组件用于复制和下载
         prompts_for_copy = gr.Textbox(visible=False)
+        last_generation_state = gr.State({})
         download_file = gr.File(
             label="📁 下载开发计划文档", 
             visible=False,
@@ -4031,6 +4066,12 @@ with gr.Blocks(
                 size="sm",
                 elem_classes="copy-btn"
             )
+            download_btn = gr.Button(
+                "📁 生成下载文件",
+                variant="secondary",
+                size="sm",
+                elem_classes="copy-btn"
+            )
             
         # 下载提示信息
         download_info = gr.HTML(
@@ -4040,128 +4081,23 @@ with gr.Blocks(
         )
             
         # 使用提示
-        gr.HTML("""
-        <div style="padding: 10px; background: #e3f2fd; border-radius: 8px; text-align: center; color: #1565c0;" id="usage_tips">
-            💡 点击上方按钮复制内容，或下载保存为文件
-        </div>
-        """)
+        gr.HTML(USAGE_TIPS_HTML)
         
     # 示例区域 - 展示多样化的应用场景
     gr.Markdown("## 🎯 Example Use Cases", elem_id="quick_start_container")
     gr.Examples(
-        examples=[
-            [
-                "AI-powered customer service system: Multi-turn dialogue, sentiment analysis, knowledge base search, automatic ticket generation, and intelligent responses",
-                "https://docs.python.org/3/library/asyncio.html"
-            ],
-            [
-                "Modern web application with React and TypeScript: User authentication, real-time data sync, responsive design, PWA support, and offline capabilities",
-                "https://react.dev/learn"
-            ],
-            [
-                "Task management platform: Team collaboration, project tracking, deadline reminders, file sharing, and progress visualization",
-                ""
-            ],
-            [
-                "E-commerce marketplace: Product catalog, shopping cart, payment integration, order management, and customer reviews",
-                "https://developer.mozilla.org/en-US/docs/Web/Progressive_web_apps"
-            ],
-            [
-                "Social media analytics dashboard: Data visualization, sentiment analysis, trend tracking, engagement metrics, and automated reporting",
-                ""
-            ],
-            [
-                "Educational learning management system: Course creation, student enrollment, progress tracking, assessments, and certificates",
-                "https://www.w3.org/WAI/WCAG21/quickref/"
-            ]
-        ],
+        examples=EXAMPLES,
+        # 仅填充输入框，由生成按钮走完整流程；重复的示例生成由计划缓存复用
         inputs=[idea_input, reference_url_input],
         label="🎯 Popular Examples - Try These Ideas",
-        examples_per_page=6,
+        examples_per_page=len(EXAMPLES),
         elem_id="enhanced_examples"
     )
     
     # 使用说明 - 功能介绍
-    gr.HTML("""
-    <div class="prompts-section" id="ai_helper_instructions">
-        <h3>🚀 How It Works - Intelligent Development Planning</h3>
-        
-        <!-- 核心功能 -->
-        <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #e8f5e8 0%, #f0fff4 100%); border-radius: 15px; border: 3px solid #28a745; margin: 15px 0;">
-            <span style="font-size: 36px;">🧠</span><br>
-            <strong style="font-size: 18px; color: #155724;">AI-Powered Analysis</strong><br>
-            <small style="color: #155724; font-weight: 600; font-size: 13px;">
-                � Intelligent planning • ⚡ Fast generation • ✅ Professional output
-            </small>
-        </div>
-        
-        <!-- 可视化支持 -->
-        <div style="text-align: center; padding: 15px; background: linear-gradient(135deg, #e3f2fd 0%, #f0f8ff 100%); border-radius: 12px; border: 2px solid #2196f3; margin: 15px 0;">
-            <span style="font-size: 30px;">�</span><br>
-            <strong style="font-size: 16px; color: #1976d2;">Visual Diagrams</strong><br>
-            <small style="color: #1976d2; font-weight: 600; font-size: 12px;">
-                🎨 Architecture • � Flowcharts • 📅 Gantt charts
-            </small>
-        </div>
-        
-        <!-- 处理流程说明 -->
-        <div style="background: linear-gradient(135deg, #fff3e0 0%, #fffaf0 100%); padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #ff9800;">
-            <strong style="color: #f57c00;">⚡ Processing Pipeline:</strong>
-            <ol style="margin: 10px 0; padding-left: 20px; font-size: 14px;">
-                <li><strong>Input Analysis</strong> → Understanding your requirements</li>
-                <li><strong>Prompt Optimization</strong> → Enhancing description quality</li>
-                <li><strong>Knowledge Retrieval</strong> → Fetching relevant information</li>
-                <li><strong>AI Generation</strong> → Creating comprehensive plan</li>
-                <li><strong>Quality Validation</strong> → Ensuring professional output</li>
-            </ol>
-        </div>
-        
-        <!-- 核心优势 -->
-        <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #6c757d;">
-            <strong style="color: #495057;">🎯 Key Advantages:</strong>
-            <ul style="margin: 10px 0; padding-left: 20px; font-size: 14px;">
-                <li><strong>Speed</strong> → 60-180 seconds generation time</li>
-                <li><strong>Quality</strong> → Professional industry-standard output</li>
-                <li><strong>Flexibility</strong> → Multiple export formats</li>
-                <li><strong>Integration</strong> → Works with all AI coding assistants</li>
-            </ul>
-        </div>
-        
-        <h4>🤖 Perfect for AI Coding Assistants</h4>
-        <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 6px; margin: 12px 0;">
-            <div style="text-align: center; padding: 8px; background: #e3f2fd; border-radius: 6px; border: 1px solid #2196f3; box-shadow: 0 2px 4px rgba(33,150,243,0.2);">
-                <span style="font-size: 16px;">🔵</span> <strong style="font-size: 12px;">Claude</strong>
-            </div>
-            <div style="text-align: center; padding: 8px; background: #e8f5e8; border-radius: 6px; border: 1px solid #4caf50; box-shadow: 0 2px 4px rgba(76,175,80,0.2);">
-                <span style="font-size: 16px;">🟢</span> <strong style="font-size: 12px;">GitHub Copilot</strong>
-            </div>
-            <div style="text-align: center; padding: 8px; background: #fff3e0; border-radius: 6px; border: 1px solid #ff9800; box-shadow: 0 2px 4px rgba(255,152,0,0.2);">
-                <span style="font-size: 16px;">🟡</span> <strong style="font-size: 12px;">ChatGPT</strong>
-            </div>
-            <div style="text-align: center; padding: 8px; background: #fce4ec; border-radius: 6px; border: 1px solid #e91e63; box-shadow: 0 2px 4px rgba(233,30,99,0.2);">
-                <span style="font-size: 16px;">🔴</span> <strong style="font-size: 12px;">Cursor</strong>
-            </div>
-        </div>
-        <p style="text-align: center; color: #28a745; font-weight: 700; font-size: 15px; background: #d4edda; padding: 8px; border-radius: 8px; border: 1px solid #c3e6cb;">
-            <em>🎉 Professional Development Plans + Ready-to-Use AI Prompts</em>
-        </p>
-    </div>
-    """)
+    gr.HTML(HOW_IT_WORKS_HTML)
     
     # 绑定事件
-    def show_download_info():
-        return gr.update(
-            value="""
-            <div style="padding: 10px; background: #e8f5e8; border-radius: 8px; text-align: center; margin: 10px 0; color: #2d5a2d;" id="download_success_info">
-                ✅ <strong style="color: #1a5a1a;">文档已生成！</strong> 您现在可以：
-                <br>• 📋 <span style="color: #2d5a2d;">复制开发计划或编程提示词</span>
-                <br>• 📁 <span style="color: #2d5a2d;">点击下方下载按钮保存文档</span>
-                <br>• 🔄 <span style="color: #2d5a2d;">调整创意重新生成</span>
-            </div>
-            """,
-            visible=True
-        )
-    
     # 优化按钮事件
     optimize_btn.click(
         fn=optimize_user_idea,
@@ -4190,86 +4126,55 @@ with gr.Blocks(
     )
     
     generate_btn.click(
-        fn=generate_development_plan,
-        inputs=[idea_input, reference_url_input],
-        outputs=[plan_output, prompts_for_copy, download_file],
+        fn=generate_plan_for_ui,
+        inputs=[idea_input, reference_url_input, last_generation_state],
+        outputs=[plan_output, prompts_for_copy, download_file, show_explanation_btn, download_info, last_generation_state],
         api_name="generate_plan"
-    ).then(
-        fn=lambda: gr.update(visible=True),
+    )
+    
+    # 计划内容更新后重新渲染图表（由Gradio change事件驱动，替代MutationObserver）；
+    # 流式输出时由前端防抖，只在内容停止变化后渲染一次
+    plan_output.change(
+        fn=None,
+        js="""() => {
+            if (window.scheduleMermaidRender) {
+                scheduleMermaidRender();
+            }
+        }"""
+    )
+    
+    # 下载文件按需生成
+    download_btn.click(
+        fn=prepare_download_file,
+        inputs=[plan_output, last_generation_state],
         outputs=[download_file]
-    ).then(
-        fn=lambda: gr.update(visible=True),
-        outputs=[show_explanation_btn]
-    ).then(
-        fn=show_download_info,
-        outputs=[download_info]
     )
     
-    # 复制按钮事件（使用JavaScript实现）
+    # 复制按钮事件（纯前端执行，复制逻辑共用static/vibedoc.js中的copyTextToClipboard）
     copy_plan_btn.click(
         fn=None,
         inputs=[plan_output],
         outputs=[],
-        js="""(plan_content) => {
-            if (navigator.clipboard && window.isSecureContext) {
-                navigator.clipboard.writeText(plan_content).then(() => {
-                    alert('✅ 开发计划已复制到剪贴板！');
-                }).catch(err => {
-                    console.error('复制失败:', err);
-                    alert('❌ 复制失败，请手动选择文本复制');
-                });
-            } else {
-                // 降级方案
-                const textArea = document.createElement('textarea');
-                textArea.value = plan_content;
-                document.body.appendChild(textArea);
-                textArea.select();
-                try {
-                    document.execCommand('copy');
-                    alert('✅ 开发计划已复制到剪贴板！');
-                } catch (err) {
-                    alert('❌ 复制失败，请手动选择文本复制');
-                }
-                document.body.removeChild(textArea);
-            }
-        }"""
+        js="(plan_content) => copyTextToClipboard(plan_content, '✅ 开发计划已复制到剪贴板！')"
     )
     
     copy_prompts_btn.click(
         fn=None,
         inputs=[prompts_for_copy],
         outputs=[],
-        js="""(prompts_content) => {
-            if (navigator.clipboard && window.isSecureContext) {
-                navigator.clipboard.writeText(prompts_content).then(() => {
-                    alert('✅ 编程提示词已复制到剪贴板！');
-                }).catch(err => {
-                    console.error('复制失败:', err);
-                    alert('❌ 复制失败，请手动选择文本复制');
-                });
-            } else {
-                // 降级方案
-                const textArea = document.createElement('textarea');
-                textArea.value = prompts_content;
-                document.body.appendChild(textArea);
-                textArea.select();
-                try {
-                    document.execCommand('copy');
-                    alert('✅ 编程提示词已复制到剪贴板！');
-                } catch (err) {
-                    alert('❌ 复制失败，请手动选择文本复制');
-                }
-                document.body.removeChild(textArea);
-            }
-        }"""
+        js="(prompts_content) => copyTextToClipboard(prompts_content, '✅ 编程提示词已复制到剪贴板！')"
     )
 
+# 请求队列 - 生成过程与编辑事件共用全局的 explanation_manager / plan_editor，
+# 每个事件保持Gradio默认的逐个处理，避免不同用户的处理记录互相覆盖；只限制排队长度
+demo.queue(max_size=64)
+
 # 启动应用 - 开源版本
 if __name__ == "__main__":
     logger.info("🚀 Starting VibeDoc Application")
     logger.info(f"🌍 Environment: {config.environment}")
     logger.info(f"� Version: 2.0.0 - Open Source Edition")
-    logger.info(f"�🔧 External Services: {[s.name for s in config.get_enabled_mcp_services()]}")
+    logger.info(f"�🔧 External Services: {list(ENABLED_MCP_NAMES)}")
     
     # 尝试多个端口以避免冲突
     ports_to_try = [7860, 7861, 7862, 7863, 7864]
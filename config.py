@@ -4,16 +4,14 @@ VibeDoc Agent应用配置文件
 """
 
 import os
-from typing import Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from dataclasses import dataclass
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
-
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MCPServiceConfig:
-    """MCP服务配置"""
+    """MCP服务配置（加载后不可变）"""
     name: str
     url: Optional[str]
     api_key: Optional[str] = None
@@ -21,9 +19,9 @@ class MCPServiceConfig:
     enabled: bool = True
     health_check_path: str = "/health"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AIModelConfig:
-    """AI模型配置"""
+    """AI模型配置（加载后不可变）"""
     provider: str = "siliconflow"
     model_name: str = "Qwen/Qwen2.5-72B-Instruct"
     api_key: str = ""
@@ -32,49 +30,77 @@ class AIModelConfig:
     temperature: float = 0.7
     timeout: int = 300  # 增加到300秒（5分钟）解决超时问题
 
+@dataclass(frozen=True, slots=True)
 class AppConfig:
-    """应用总配置类"""
+    """应用总配置类（由 from_env() 一次性从环境变量构建，加载后不可变）"""
+    environment: str
+    debug: bool
+    port: int
+    ai_model: AIModelConfig
+    mcp_services: Mapping[str, MCPServiceConfig]
+    enabled_services: Tuple[MCPServiceConfig, ...]
+    features: Mapping[str, bool]
+    plan_cache_enabled: bool
+    plan_cache_dir: str
+    plan_cache_ttl: int
+    log_level: str
+    log_format: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     
-    def __init__(self):
-        self.environment = os.getenv("ENVIRONMENT", "development")
-        self.debug = os.getenv("DEBUG", "false").lower() == "true"
-        self.port = int(os.getenv("PORT", "7860"))
-        
+    @classmethod
+    def from_env(cls) -> "AppConfig":
+        """从环境变量读取并构建配置"""
         # AI模型配置
-        self.ai_model = AIModelConfig(
+        ai_model = AIModelConfig(
             api_key=os.getenv("SILICONFLOW_API_KEY", ""),
             timeout=int(os.getenv("API_TIMEOUT", "300"))
         )
         
         # 简化MCP服务配置 - 直接使用内置URL，避免环境变量复杂性
-        self.mcp_services = {
+        mcp_timeout = int(os.getenv("MCP_TIMEOUT", "60"))
+        mcp_services = MappingProxyType({
             "deepwiki": MCPServiceConfig(
                 name="DeepWiki MCP",
                 url="https://mcp.api-inference.modelscope.net/d4ed08072d2846/sse",
-                timeout=int(os.getenv("MCP_TIMEOUT", "60")),
+                timeout=mcp_timeout,
                 enabled=True  # 默认启用，简化配置
             ),
             "fetch": MCPServiceConfig(
                 name="Fetch MCP", 
                 url="https://mcp.api-inference.modelscope.net/6ec508e067dc41/sse",
-                timeout=int(os.getenv("MCP_TIMEOUT", "60")),
+                timeout=mcp_timeout,
                 enabled=True  # 默认启用，简化配置
             )
-        }
+        })
         
-        # 应用功能配置
-        self.features = {
-            "external_knowledge": any(service.enabled for service in self.mcp_services.values()),
-            "multi_mcp_fusion": sum(service.enabled for service in self.mcp_services.values()) > 1
-        }
+        # 已启用的MCP服务 - 服务配置加载后不再变化，只筛选一次
+        enabled_services = tuple(
+            service for service in mcp_services.values() if service.enabled
+        )
+        enabled_count = len(enabled_services)
         
-        # 日志配置
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        self.log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        return cls(
+            environment=os.getenv("ENVIRONMENT", "development"),
+            debug=os.getenv("DEBUG", "false").lower() == "true",
+            port=int(os.getenv("PORT", "7860")),
+            ai_model=ai_model,
+            mcp_services=mcp_services,
+            enabled_services=enabled_services,
+            # 应用功能配置
+            features=MappingProxyType({
+                "external_knowledge": enabled_count > 0,
+                "multi_mcp_fusion": enabled_count > 1
+            }),
+            # 方案缓存配置 - 相同创意与参考链接直接复用已生成的方案
+            plan_cache_enabled=os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true",
+            plan_cache_dir=os.getenv("PLAN_CACHE_DIR", ".vibedoc_cache"),
+            plan_cache_ttl=int(os.getenv("PLAN_CACHE_TTL", "86400")),  # 默认缓存1天，避免计划日期过时
+            # 日志配置
+            log_level=os.getenv("LOG_LEVEL", "INFO")
+        )
     
-    def get_enabled_mcp_services(self) -> List[MCPServiceConfig]:
+    def get_enabled_mcp_services(self) -> Tuple[MCPServiceConfig, ...]:
         """获取已启用的MCP服务列表"""
-        return [service for service in self.mcp_services.values() if service.enabled]
+        return self.enabled_services
     
     def get_mcp_service(self, service_key: str) -> Optional[MCPServiceConfig]:
         """获取指定的MCP服务配置"""
@@ -117,14 +143,28 @@ class AppConfig:
                 "enabled": len(enabled_services),
                 "services": [service.name for service in enabled_services]
             },
-            "features": self.features
+            "features": dict(self.features)
         }
 
+def _load_env_file() -> None:
+    """加载 .env 文件中的环境变量（未安装 python-dotenv 时只使用系统环境变量）"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """获取全局配置单例，.env 文件和环境变量只在首次调用时读取和解析"""
+    _load_env_file()
+    return AppConfig.from_env()
+
 # 全局配置实例
-config = AppConfig()
+config = get_config()
 
 # 常用配置常量
-EXAMPLE_CONFIGURATIONS = {
+_RAW_EXAMPLE_CONFIGURATIONS = {
     "web_applications": {
         "description": "Web Application Development Examples",
         "examples": [
@@ -170,4 +210,13 @@ EXAMPLE_CONFIGURATIONS = {
             }
         ]
     }
-}
\ No newline at end of file
+}
+
+# 对外暴露只读视图，调用方共享同一份数据且无法意外修改
+EXAMPLE_CONFIGURATIONS = MappingProxyType({
+    category: MappingProxyType({
+        **group,
+        "examples": tuple(MappingProxyType(example) for example in group["examples"])
+    })
+    for category, group in _RAW_EXAMPLE_CONFIGURATIONS.items()
+})
@@ -7,18 +7,40 @@
 import requests
 import json
 import time
+import hashlib
+import itertools
 import threading
 import queue
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from urllib.parse import urljoin
+from utils import json_loads, json_dumps_bytes, create_session
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# JSON-RPC请求ID生成器 - 进程内单调递增，避免同一毫秒内的请求ID冲突
+_request_id_counter = itertools.count(1)
+
+# JSON-RPC工具调用请求的固定部分和请求头 - 每次调用只填充id和params
+MCP_REQUEST_TEMPLATE = {"jsonrpc": "2.0", "method": "tools/call"}
+MCP_REQUEST_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# 响应内容提取时依次检查的字段（result内部 / 响应顶层）
+RESULT_TEXT_FIELDS = ("text", "data", "message")
+RESPONSE_CONTENT_FIELDS = ("content", "data", "text", "message", "response")
+
+def _elapsed_since(start_ns: int) -> float:
+    """计算自start_ns（time.monotonic_ns）以来经过的秒数，不受系统时钟调整影响"""
+    return (time.monotonic_ns() - start_ns) / 1e9
+
+@dataclass(frozen=True, slots=True)
 class AsyncMCPResult:
-    """异步MCP调用结果"""
+    """异步MCP调用结果（创建后不可变，可被缓存安全共享）"""
     success: bool
     data: str
     service_name: str
@@ -32,6 +54,17 @@ class AsyncMCPClient:
     def __init__(self):
         self.timeout = 60
         self.result_timeout = 30  # 等待异步结果的超时时间
+        self.listener_ready_timeout = 5  # 等待结果监听器建立连接的最长时间
+        
+        # 响应缓存 - 相同服务、工具和参数的调用结果是幂等的，有效期内直接复用
+        self.cache_ttl = 300  # 秒
+        self.cache_max_size = 512
+        self._response_cache: "OrderedDict[bytes, Tuple[float, AsyncMCPResult]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # 共享HTTP会话 - SSE握手、结果监听和请求发送都指向同一主机，复用TCP/TLS连接
+        # 连接池 + 瞬时故障重试；POST默认不在重试方法内，避免重复发送工具调用
+        self.session = create_session(pool_connections=20, pool_maxsize=50, backoff_factor=0.2)
         
         # 魔塔MCP服务配置
         self.mcp_services = {
@@ -70,90 +103,134 @@ class AsyncMCPClient:
                 "Cache-Control": "no-cache"
             }
             
-            logger.info(f"🔗 连接SSE: {service_url}")
-            response = requests.get(service_url, headers=headers, timeout=15, stream=True)
-            
-            if response.status_code != 200:
-                logger.error(f"❌ SSE连接失败: HTTP {response.status_code}")
-                return False, None, None
-            
-            # 解析SSE事件
-            for line in response.iter_lines(decode_unicode=True):
-                if line.startswith('data: '):
-                    data = line[6:]  # 去掉 'data: ' 前缀
-                    if '/messages/' in data and 'session_id=' in data:
-                        session_id = data.split('session_id=')[1]
-                        logger.info(f"✅ 获取session_id: {session_id}")
-                        response.close()
-                        return True, data, session_id
-                elif line == "":
-                    break
+            logger.info("🔗 连接SSE: %s", service_url)
+            # 使用with确保任何返回路径都会关闭流式连接，避免占用连接池
+            with self.session.get(service_url, headers=headers, timeout=15, stream=True) as response:
+                if response.status_code != 200:
+                    logger.error("❌ SSE连接失败: HTTP %d", response.status_code)
+                    return False, None, None
+                
+                # 逐帧解析SSE事件，拿到endpoint即返回，不读取后续流内容
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith('data: '):
+                        data = line[6:]  # 去掉 'data: ' 前缀
+                        if '/messages/' in data and 'session_id=' in data:
+                            session_id = data.split('session_id=')[1]
+                            logger.info("✅ 获取session_id: %s", session_id)
+                            return True, data, session_id
+                    elif line == "":
+                        break
             
-            response.close()
             logger.error("❌ 未获取到有效的endpoint")
             return False, None, None
             
         except Exception as e:
-            logger.error(f"💥 SSE连接异常: {str(e)}")
+            logger.error("💥 SSE连接异常: %s", e)
             return False, None, None
     
-    def _listen_for_result(self, service_url: str, session_id: str, result_queue: queue.Queue):
-        """监听SSE流获取异步结果"""
+    def _listen_for_result(
+        self,
+        service_url: str,
+        session_id: str,
+        result_queue: queue.Queue,
+        listener_ready: threading.Event
+    ):
+        """监听SSE流获取异步结果，连接建立（或失败）后通过listener_ready通知调用方"""
         try:
             headers = {
                 "Accept": "text/event-stream",
                 "Cache-Control": "no-cache"
             }
             
-            logger.info(f"👂 开始监听结果...")
-            response = requests.get(service_url, headers=headers, timeout=self.result_timeout, stream=True)
-            
-            if response.status_code != 200:
-                result_queue.put(("error", f"监听连接失败: HTTP {response.status_code}"))
-                return
-            
-            # 监听SSE事件
-            for line in response.iter_lines(decode_unicode=True):
-                if line.startswith('data: '):
-                    data_str = line[6:]
-                    try:
-                        # 尝试解析JSON数据
-                        data = json.loads(data_str)
-                        if isinstance(data, dict):
-                            # 检查是否是MCP响应
-                            if "result" in data or "error" in data:
-                                logger.info("✅ 收到MCP响应")
-                                result_queue.put(("success", data))
-                                break
-                            elif "id" in data:  # 可能是MCP响应
-                                result_queue.put(("success", data))
+            logger.info("👂 开始监听结果...")
+            # 使用with确保任何返回路径都会关闭流式连接，避免占用连接池
+            with self.session.get(service_url, headers=headers, timeout=self.result_timeout, stream=True) as response:
+                listener_ready.set()
+                
+                if response.status_code != 200:
+                    result_queue.put(("error", f"监听连接失败: HTTP {response.status_code}"))
+                    return
+                
+                # 监听SSE事件
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith('data: '):
+                        data_str = line[6:]
+                        try:
+                            # 尝试解析JSON数据
+                            data = json_loads(data_str)
+                            if isinstance(data, dict):
+                                # 检查是否是MCP响应
+                                if "result" in data or "error" in data:
+                                    logger.info("✅ 收到MCP响应")
+                                    result_queue.put(("success", data))
+                                    break
+                                elif "id" in data:  # 可能是MCP响应
+                                    result_queue.put(("success", data))
+                                    break
+                        except json.JSONDecodeError:
+                            # 非JSON数据，可能是纯文本结果
+                            if len(data_str.strip()) > 10:
+                                logger.info("✅ 收到文本响应")
+                                result_queue.put(("success", {"result": {"text": data_str}}))
                                 break
-                    except json.JSONDecodeError:
-                        # 非JSON数据，可能是纯文本结果
-                        if len(data_str.strip()) > 10:
-                            logger.info("✅ 收到文本响应")
-                            result_queue.put(("success", {"result": {"text": data_str}}))
-                            break
-                elif line.startswith('event: '):
-                    event_type = line[7:]
-                    logger.debug(f"📨 SSE事件: {event_type}")
-            
-            response.close()
+                    elif line.startswith('event: '):
+                        event_type = line[7:]
+                        logger.debug("📨 SSE事件: %s", event_type)
             
         except requests.exceptions.Timeout:
             logger.warning("⏰ 结果监听超时")
             result_queue.put(("timeout", "等待结果超时"))
         except Exception as e:
-            logger.error(f"💥 监听异常: {str(e)}")
+            logger.error("💥 监听异常: %s", e)
             result_queue.put(("error", f"监听异常: {str(e)}"))
+        finally:
+            # 异常退出时也要唤醒调用方，避免其空等
+            listener_ready.set()
+    
+    def _get_cache_key(self, service_key: str, tool_name: str, tool_args: Dict[str, Any]) -> bytes:
+        """根据服务、工具和参数生成稳定的缓存键（参数按键排序）"""
+        payload = json_dumps_bytes([service_key, tool_name, tool_args], sort_keys=True)
+        return hashlib.blake2b(payload, digest_size=16).digest()
     
     def call_mcp_service_async(
+        self,
+        service_key: str,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        use_cache: bool = True
+    ) -> AsyncMCPResult:
+        """异步调用MCP服务，成功结果在有效期内缓存；连通性检测等场景可传入use_cache=False"""
+        if not use_cache:
+            return self._call_mcp_service(service_key, tool_name, tool_args)
+        
+        cache_key = self._get_cache_key(service_key, tool_name, tool_args)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._response_cache.get(cache_key)
+            if cached and now - cached[0] < self.cache_ttl:
+                self._response_cache.move_to_end(cache_key)
+                logger.info("⚡ 命中MCP响应缓存: %s/%s", service_key, tool_name)
+                return replace(cached[1], execution_time=0.0)
+        
+        result = self._call_mcp_service(service_key, tool_name, tool_args)
+        
+        # 只缓存成功结果，失败时下次仍会重新请求
+        if result.success:
+            with self._cache_lock:
+                self._response_cache[cache_key] = (now, result)
+                self._response_cache.move_to_end(cache_key)
+                while len(self._response_cache) > self.cache_max_size:
+                    self._response_cache.popitem(last=False)
+        
+        return result
+    
+    def _call_mcp_service(
         self,
         service_key: str,
         tool_name: str,
         tool_args: Dict[str, Any]
     ) -> AsyncMCPResult:
-        """异步调用MCP服务"""
+        """实际发起MCP服务调用"""
         
         if service_key not in self.mcp_services:
             return AsyncMCPResult(
@@ -168,11 +245,13 @@ class AsyncMCPClient:
         service_url = service_config["url"]
         service_name = service_config["name"]
         
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
-        logger.info(f"🚀 开始调用 {service_name}")
-        logger.info(f"📊 工具: {tool_name}")
-        logger.info(f"📋 参数: {json.dumps(tool_args, ensure_ascii=False)}")
+        logger.info("🚀 开始调用 %s", service_name)
+        logger.info("📊 工具: %s", tool_name)
+        # 参数序列化开销较大，仅在INFO级别启用时才执行
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📋 参数: %s", json_dumps_bytes(tool_args).decode('utf-8'))
         
         # 步骤1: 获取SSE endpoint
         success, endpoint_path, session_id = self._get_sse_endpoint(service_url)
@@ -181,21 +260,23 @@ class AsyncMCPClient:
                 success=False,
                 data="",
                 service_name=service_name,
-                execution_time=time.time() - start_time,
+                execution_time=_elapsed_since(start_ns),
                 error_message="获取endpoint失败"
             )
         
         # 步骤2: 启动结果监听器
         result_queue = queue.Queue()
+        listener_ready = threading.Event()
         listener_thread = threading.Thread(
             target=self._listen_for_result,
-            args=(service_url, session_id, result_queue)
+            args=(service_url, session_id, result_queue, listener_ready)
         )
         listener_thread.daemon = True
         listener_thread.start()
         
-        # 等待一小段时间确保监听器就绪
-        time.sleep(0.5)
+        # 等待监听器建立连接后再发送请求，而不是固定睡眠
+        if not listener_ready.wait(timeout=self.listener_ready_timeout):
+            logger.warning("⏰ 结果监听器未能及时就绪，继续发送请求")
         
         # 步骤3: 发送MCP请求
         try:
@@ -203,24 +284,15 @@ class AsyncMCPClient:
             full_endpoint = urljoin(base_url, endpoint_path)
             
             mcp_request = {
-                "jsonrpc": "2.0",
-                "id": int(time.time() * 1000),
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": tool_args
-                }
+                **MCP_REQUEST_TEMPLATE,
+                "id": next(_request_id_counter),
+                "params": {"name": tool_name, "arguments": tool_args}
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            logger.info(f"📤 发送请求到: {full_endpoint}")
-            response = requests.post(full_endpoint, json=mcp_request, headers=headers, timeout=10)
+            logger.info("📤 发送请求到: %s", full_endpoint)
+            response = self.session.post(full_endpoint, data=json_dumps_bytes(mcp_request), headers=MCP_REQUEST_HEADERS, timeout=10)
             
-            logger.info(f"📊 请求响应: HTTP {response.status_code}")
+            logger.info("📊 请求响应: HTTP %d", response.status_code)
             
             if response.status_code == 202:  # Accepted - 异步处理
                 logger.info("✅ 请求已接受，等待异步结果...")
@@ -229,13 +301,13 @@ class AsyncMCPClient:
                 try:
                     result_type, result_data = result_queue.get(timeout=self.result_timeout)
                     
-                    execution_time = time.time() - start_time
+                    execution_time = _elapsed_since(start_ns)
                     
                     if result_type == "success":
                         # 解析结果数据
                         content = self._extract_content_from_response(result_data)
                         if content and len(content.strip()) > 10:
-                            logger.info(f"✅ {service_name} 异步调用成功!")
+                            logger.info("✅ %s 异步调用成功!", service_name)
                             return AsyncMCPResult(
                                 success=True,
                                 data=content,
@@ -267,7 +339,7 @@ class AsyncMCPClient:
                         success=False,
                         data="",
                         service_name=service_name,
-                        execution_time=time.time() - start_time,
+                        execution_time=_elapsed_since(start_ns),
                         session_id=session_id,
                         error_message="等待异步结果超时"
                     )
@@ -275,9 +347,9 @@ class AsyncMCPClient:
             elif response.status_code == 200:
                 # 同步响应
                 try:
-                    data = response.json()
+                    data = json_loads(response.content)
                     content = self._extract_content_from_response(data)
-                    execution_time = time.time() - start_time
+                    execution_time = _elapsed_since(start_ns)
                     
                     return AsyncMCPResult(
                         success=bool(content and len(content.strip()) > 10),
@@ -293,7 +365,7 @@ class AsyncMCPClient:
                         success=len(content.strip()) > 10,
                         data=content,
                         service_name=service_name,
-                        execution_time=time.time() - start_time,
+                        execution_time=_elapsed_since(start_ns),
                         session_id=session_id
                     )
             else:
@@ -301,7 +373,7 @@ class AsyncMCPClient:
                     success=False,
                     data="",
                     service_name=service_name,
-                    execution_time=time.time() - start_time,
+                    execution_time=_elapsed_since(start_ns),
                     session_id=session_id,
                     error_message=f"HTTP {response.status_code}: {response.text[:200]}"
                 )
@@ -311,7 +383,7 @@ class AsyncMCPClient:
                 success=False,
                 data="",
                 service_name=service_name,
-                execution_time=time.time() - start_time,
+                execution_time=_elapsed_since(start_ns),
                 session_id=session_id,
                 error_message=f"请求异常: {str(e)}"
             )
@@ -327,19 +399,19 @@ class AsyncMCPClient:
                 if "result" in response_data:
                     result = response_data["result"]
                     
-                    # 检查content数组
-                    if "content" in result and isinstance(result["content"], list):
-                        contents = []
-                        for item in result["content"]:
-                            if isinstance(item, dict) and "text" in item:
-                                contents.append(item["text"])
-                            elif isinstance(item, str):
-                                contents.append(item)
+                    # 检查content数组 - 最常见的响应形态，只查找一次字段
+                    content = result.get("content") if isinstance(result, dict) else None
+                    if isinstance(content, list):
+                        contents = [
+                            item["text"] if isinstance(item, dict) else item
+                            for item in content
+                            if isinstance(item, str) or (isinstance(item, dict) and "text" in item)
+                        ]
                         if contents:
                             return "\n".join(contents)
                     
                     # 检查其他字段
-                    for field in ["text", "data", "message"]:
+                    for field in RESULT_TEXT_FIELDS:
                         if field in result and result[field]:
                             return str(result[field])
                     
@@ -356,8 +428,8 @@ class AsyncMCPClient:
                         return f"错误: {str(error)}"
                 
                 # 检查直接的字段
-                for field in ["content", "data", "text", "message", "response"]:
-                    if field in response_data and response_data[field]:
+                for field in RESPONSE_CONTENT_FIELDS:
+                    if response_data.get(field):
                         content = response_data[field]
                         if isinstance(content, list):
                             return "\n".join(str(item) for item in content if item)
@@ -368,8 +440,12 @@ class AsyncMCPClient:
             return json.dumps(response_data, ensure_ascii=False, indent=2)
             
         except Exception as e:
-            logger.warning(f"⚠️ 内容提取失败: {e}")
+            logger.warning("⚠️ 内容提取失败: %s", e)
             return str(response_data) if response_data else None
+    
+    def close(self):
+        """关闭共享HTTP会话，释放连接池中的空闲连接"""
+        self.session.close()
 
 # 全局实例
 async_mcp_client = AsyncMCPClient()
@@ -21,9 +21,20 @@ class ProcessingStage(Enum):
     CONTENT_FORMATTING = "content_formatting"
     RESULT_VALIDATION = "result_validation"
 
-@dataclass
+# 阶段显示名称 - 模块加载时构建一次，格式化每个步骤时直接查表
+STAGE_NAMES = {
+    ProcessingStage.INPUT_VALIDATION: "输入验证",
+    ProcessingStage.PROMPT_OPTIMIZATION: "提示词优化",
+    ProcessingStage.KNOWLEDGE_RETRIEVAL: "知识获取",
+    ProcessingStage.AI_GENERATION: "AI生成",
+    ProcessingStage.QUALITY_ASSESSMENT: "质量评估",
+    ProcessingStage.CONTENT_FORMATTING: "内容格式化",
+    ProcessingStage.RESULT_VALIDATION: "结果验证"
+}
+
+@dataclass(frozen=True, slots=True)
 class ProcessingStep:
-    """处理步骤数据结构"""
+    """处理步骤数据结构（记录后不可变）"""
     stage: ProcessingStage
     title: str
     description: str
@@ -40,6 +51,8 @@ class ExplanationManager:
     def __init__(self):
         self.processing_steps: List[ProcessingStep] = []
         self.sop_guidelines = self._load_sop_guidelines()
+        # SOP指导原则是静态内容，格式化结果只生成一次
+        self._sop_guidelines_text = self._format_sop_guidelines()
         self.quality_metrics = {}
         
     def start_processing(self):
@@ -71,7 +84,7 @@ class ExplanationManager:
         )
         
         self.processing_steps.append(step)
-        logger.info(f"📝 记录处理步骤: {title} - {'✅' if success else '❌'}")
+        logger.info("📝 记录处理步骤: %s - %s", title, '✅' if success else '❌')
     
     def get_processing_explanation(self) -> str:
         """获取处理过程的详细说明"""
@@ -107,18 +120,23 @@ class ExplanationManager:
     
     def _generate_sop_compliance_report(self) -> str:
         """生成SOP合规报告"""
+        compliance = self._get_sop_compliance()
+        
+        def status(stage_name: str) -> str:
+            return '✅ 通过' if compliance.get(stage_name, False) else '❌ 未通过'
+        
         return f"""
 ## 📋 SOP (标准操作程序) 合规报告
 
 ### 🎯 质量保证标准
-{self._format_sop_guidelines()}
+{self._sop_guidelines_text}
 
 ### ✅ 合规性检查
-- **输入验证**: {'✅ 通过' if self._check_sop_compliance('input_validation') else '❌ 未通过'}
-- **知识获取**: {'✅ 通过' if self._check_sop_compliance('knowledge_retrieval') else '❌ 未通过'}
-- **AI生成**: {'✅ 通过' if self._check_sop_compliance('ai_generation') else '❌ 未通过'}
-- **质量评估**: {'✅ 通过' if self._check_sop_compliance('quality_assessment') else '❌ 未通过'}
-- **内容格式化**: {'✅ 通过' if self._check_sop_compliance('content_formatting') else '❌ 未通过'}
+- **输入验证**: {status('input_validation')}
+- **知识获取**: {status('knowledge_retrieval')}
+- **AI生成**: {status('ai_generation')}
+- **质量评估**: {status('quality_assessment')}
+- **内容格式化**: {status('content_formatting')}
 
 ---
 
@@ -232,24 +250,17 @@ class ExplanationManager:
             formatted += "\n"
         return formatted
     
-    def _check_sop_compliance(self, stage_name: str) -> bool:
-        """检查SOP合规性"""
-        relevant_steps = [step for step in self.processing_steps 
-                         if step.stage.value == stage_name]
-        return len(relevant_steps) > 0 and all(step.success for step in relevant_steps)
+    def _get_sop_compliance(self) -> Dict[str, bool]:
+        """单次遍历处理步骤，得到各阶段的SOP合规结果（该阶段有步骤且全部成功）"""
+        compliance: Dict[str, bool] = {}
+        for step in self.processing_steps:
+            stage_name = step.stage.value
+            compliance[stage_name] = compliance.get(stage_name, True) and step.success
+        return compliance
     
     def _get_stage_name(self, stage: ProcessingStage) -> str:
         """获取阶段名称"""
-        stage_names = {
-            ProcessingStage.INPUT_VALIDATION: "输入验证",
-            ProcessingStage.PROMPT_OPTIMIZATION: "提示词优化",
-            ProcessingStage.KNOWLEDGE_RETRIEVAL: "知识获取",
-            ProcessingStage.AI_GENERATION: "AI生成",
-            ProcessingStage.QUALITY_ASSESSMENT: "质量评估",
-            ProcessingStage.CONTENT_FORMATTING: "内容格式化",
-            ProcessingStage.RESULT_VALIDATION: "结果验证"
-        }
-        return stage_names.get(stage, stage.value)
+        return STAGE_NAMES.get(stage, stage.value)
     
     def _format_step_details(self, details: Dict[str, Any]) -> str:
         """格式化步骤详情"""
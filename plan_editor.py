@@ -6,12 +6,16 @@
 import re
 import json
 import logging
+from collections import deque
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# 编辑历史最多保留的条数 - 全局编辑器常驻进程，避免历史记录无限增长
+EDIT_HISTORY_MAX_SIZE = 100
+
 @dataclass
 class EditableSection:
     """可编辑的方案段落"""
@@ -31,7 +35,8 @@ class PlanEditor:
         self.sections: List[EditableSection] = []
         self.original_content = ""
         self.modified_content = ""
-        self.edit_history: List[Dict] = []
+        self.edit_history: "deque[Dict]" = deque(maxlen=EDIT_HISTORY_MAX_SIZE)
+        self.edit_count = 0  # 编辑总次数，不受历史记录条数上限影响
     
     def parse_plan_content(self, content: str) -> List[EditableSection]:
         """解析开发计划内容为可编辑段落"""
@@ -273,13 +278,13 @@ class PlanEditor:
                 return False
             
             # 记录编辑历史
+            # 只记录展示所需的元数据，不保留整段内容的新旧副本
             self.edit_history.append({
                 'timestamp': datetime.now().isoformat(),
                 'section_id': section_id,
-                'old_content': target_section.content,
-                'new_content': new_content,
                 'user_comment': user_comment
             })
+            self.edit_count += 1
             
             # 更新内容
             target_section.content = new_content
@@ -334,22 +339,23 @@ class PlanEditor:
         return self.modified_content if self.modified_content else self.original_content
     
     def get_edit_history(self) -> List[Dict]:
-        """获取编辑历史"""
-        return self.edit_history
+        """获取编辑历史（最近 EDIT_HISTORY_MAX_SIZE 条）"""
+        return list(self.edit_history)
     
     def get_edit_summary(self) -> Dict:
         """获取编辑摘要"""
         return {
             'total_sections': len(self.sections),
             'editable_sections': len([s for s in self.sections if s.is_editable]),
-            'edited_sections': len(self.edit_history),
+            'edited_sections': self.edit_count,
             'last_edit_time': self.edit_history[-1]['timestamp'] if self.edit_history else None
         }
     
     def reset_to_original(self):
         """重置到原始内容"""
         self.modified_content = self.original_content
-        self.edit_history = []
+        self.edit_history.clear()
+        self.edit_count = 0
         # 重新解析段落
         self.parse_plan_content(self.original_content)
         logger.info("已重置到原始内容")
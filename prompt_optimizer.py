@@ -3,11 +3,11 @@
 使用AI优化用户输入的创意描述，提升生成报告的质量
 """
 
-import requests
 import json
 import logging
 from typing import Tuple, Dict, Any, Optional
 from config import config
+from utils import json_loads, create_session
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,16 @@ class PromptOptimizer:
         self.api_url = config.ai_model.api_url
         self.model_name = config.ai_model.model_name
         
+        # 共享HTTP会话 - 多次优化请求复用到AI接口的TCP/TLS连接，请求头只设置一次
+        self.session = create_session(
+            pool_connections=2,
+            pool_maxsize=4,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}"
+            }
+        )
+        
     def optimize_user_input(self, user_idea: str) -> Tuple[bool, str, str]:
         """
         优化用户输入的创意描述
@@ -88,11 +98,6 @@ class PromptOptimizer:
     def _call_ai_service(self, prompt: str) -> Dict[str, Any]:
         """调用AI服务"""
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
             payload = {
                 "model": self.model_name,
                 "messages": [
@@ -102,15 +107,14 @@ class PromptOptimizer:
                 "temperature": 0.7
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                headers=headers,
                 json=payload,
                 timeout=300  # 优化：创意描述优化超时时间为300秒（5分钟）
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
                 return {"success": True, "data": content}
             else:
@@ -128,7 +132,7 @@ class PromptOptimizer:
             
             if start_idx != -1 and end_idx != -1:
                 json_str = ai_response[start_idx:end_idx]
-                result = json.loads(json_str)
+                result = json_loads(json_str)
                 
                 return {
                     "optimized_idea": result.get("optimized_idea", ""),
@@ -0,0 +1,347 @@
+/*
+ * VibeDoc 前端脚本
+ * Mermaid图表渲染、主题切换与提示词复制/编辑功能
+ * 由 app.py 通过 gr.Blocks(head=...) 以外部文件方式加载，便于浏览器缓存
+ */
+
+// Gradio 在页面加载后才插入 head 中的脚本，执行顺序不固定，DOMContentLoaded 也可能早已触发
+const MERMAID_WAIT_INTERVAL = 100;
+const MERMAID_WAIT_ATTEMPTS = 150;
+
+// 流式输出期间内容每50毫秒变化一次，内容停止变化超过该时长后才渲染图表
+const MERMAID_RENDER_DEBOUNCE = 500;
+let mermaidRenderTimer = null;
+
+// 页面就绪后执行；若文档已加载完成则立即执行
+function onPageReady(callback) {
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', callback);
+    } else {
+        callback();
+    }
+}
+
+// 等待Mermaid CDN脚本加载完成后再执行回调
+function whenMermaidReady(callback, attempts = MERMAID_WAIT_ATTEMPTS) {
+    if (window.mermaid) {
+        callback();
+    } else if (attempts > 0) {
+        setTimeout(() => whenMermaidReady(callback, attempts - 1), MERMAID_WAIT_INTERVAL);
+    } else {
+        console.warn('Mermaid脚本加载超时，图表将以源码显示');
+    }
+}
+
+// 监听主题变化，动态更新Mermaid主题
+function updateMermaidTheme() {
+    const isDark = document.documentElement.classList.contains('dark');
+    const theme = isDark ? 'dark' : 'default';
+    mermaid.initialize({ 
+        startOnLoad: true,
+        theme: theme,
+        flowchart: {
+            useMaxWidth: true,
+            htmlLabels: true,
+            curve: 'basis'
+        },
+        gantt: {
+            useMaxWidth: true,
+            gridLineStartPadding: 350,
+            fontSize: 13,
+            fontFamily: '"Inter", "Source Sans Pro", sans-serif',
+            sectionFontSize: 24,
+            numberSectionStyles: 4
+        },
+        themeVariables: isDark ? {
+            primaryColor: '#60a5fa',
+            primaryTextColor: '#f8fafc',
+            primaryBorderColor: '#3b82f6',
+            lineColor: '#94a3b8',
+            secondaryColor: '#1e293b',
+            tertiaryColor: '#0f172a',
+            background: '#1f2937',
+            mainBkg: '#1f2937',
+            secondBkg: '#374151',
+            tertiaryBkg: '#1e293b'
+        } : {
+            primaryColor: '#3b82f6',
+            primaryTextColor: '#1f2937',
+            primaryBorderColor: '#1d4ed8',
+            lineColor: '#6b7280',
+            secondaryColor: '#dbeafe',
+            tertiaryColor: '#f8fafc',
+            background: '#ffffff',
+            mainBkg: '#ffffff',
+            secondBkg: '#f1f5f9',
+            tertiaryBkg: '#eff6ff'
+        }
+    });
+
+    // 重新渲染所有Mermaid图表
+    renderMermaidCharts();
+}
+
+// 强化的Mermaid图表渲染函数
+async function renderMermaidCharts() {
+    if (!window.mermaid) {
+        return;
+    }
+    try {
+        // 清除现有的渲染内容
+        document.querySelectorAll('.mermaid').forEach(element => {
+            if (element.getAttribute('data-processed') !== 'true') {
+                element.removeAttribute('data-processed');
+            }
+        });
+
+        // 处理包装器中的Mermaid内容
+        document.querySelectorAll('.mermaid-render').forEach(element => {
+            const content = element.textContent.trim();
+            if (content && !element.classList.contains('rendered')) {
+                element.innerHTML = content;
+                element.classList.add('mermaid', 'rendered');
+            }
+        });
+
+        // 批量渲染所有未处理的图表，解析器只需初始化一次
+        const nodes = Array.from(document.querySelectorAll('.mermaid:not([data-processed="true"])'));
+        if (nodes.length > 0) {
+            await mermaid.run({ nodes, suppressErrors: true });
+        }
+
+    } catch (error) {
+        console.warn('Mermaid渲染警告:', error);
+        // 如果渲染失败，显示错误信息
+        document.querySelectorAll('.mermaid-render').forEach(element => {
+            if (!element.classList.contains('rendered')) {
+                element.innerHTML = '<div class="mermaid-error">图表渲染中，请稍候...</div>';
+            }
+        });
+    }
+}
+
+// 防抖调度图表渲染，避免对生成到一半的Mermaid代码反复渲染
+function scheduleMermaidRender() {
+    clearTimeout(mermaidRenderTimer);
+    mermaidRenderTimer = setTimeout(renderMermaidCharts, MERMAID_RENDER_DEBOUNCE);
+}
+
+// 单独复制提示词功能
+function copyIndividualPrompt(promptId, promptContent) {
+    // 解码HTML实体
+    const decodedContent = promptContent.replace(/\\n/g, '\n').replace(/\\'/g, "'").replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&');
+
+    if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(decodedContent).then(() => {
+            showCopySuccess(promptId);
+        }).catch(err => {
+            console.error('复制失败:', err);
+            fallbackCopy(decodedContent);
+        });
+    } else {
+        fallbackCopy(decodedContent);
+    }
+}
+
+// 编辑提示词功能
+function editIndividualPrompt(promptId, promptContent) {
+    // 解码HTML实体
+    const decodedContent = promptContent.replace(/\\n/g, '\n').replace(/\\'/g, "'").replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&');
+
+    // 检测当前主题
+    const isDark = document.documentElement.classList.contains('dark');
+
+    // 创建编辑对话框
+    const editDialog = document.createElement('div');
+    editDialog.style.cssText = `
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 100%;
+        background: rgba(0, 0, 0, 0.5);
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        z-index: 10000;
+    `;
+
+    editDialog.innerHTML = `
+        <div style="
+            background: ${isDark ? '#2d3748' : 'white'};
+            color: ${isDark ? '#f7fafc' : '#2d3748'};
+            padding: 2rem;
+            border-radius: 1rem;
+            max-width: 80%;
+            max-height: 80%;
+            overflow-y: auto;
+            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
+        ">
+            <h3 style="margin-bottom: 1rem; color: ${isDark ? '#f7fafc' : '#2d3748'};">✏️ 编辑提示词</h3>
+            <textarea
+                id="prompt-editor-${promptId}"
+                style="
+                    width: 100%;
+                    height: 300px;
+                    padding: 1rem;
+                    border: 2px solid ${isDark ? '#4a5568' : '#e2e8f0'};
+                    border-radius: 0.5rem;
+                    font-family: 'Fira Code', monospace;
+                    font-size: 0.9rem;
+                    resize: vertical;
+                    line-height: 1.5;
+                    background: ${isDark ? '#1a202c' : 'white'};
+                    color: ${isDark ? '#f7fafc' : '#2d3748'};
+                "
+                placeholder="在此编辑您的提示词..."
+            >${decodedContent}</textarea>
+            <div style="margin-top: 1rem; display: flex; gap: 1rem; justify-content: flex-end;">
+                <button
+                    id="cancel-edit-${promptId}"
+                    style="
+                        padding: 0.5rem 1rem;
+                        border: 1px solid ${isDark ? '#4a5568' : '#cbd5e0'};
+                        background: ${isDark ? '#2d3748' : 'white'};
+                        color: ${isDark ? '#f7fafc' : '#4a5568'};
+                        border-radius: 0.5rem;
+                        cursor: pointer;
+                        transition: all 0.2s ease;
+                    "
+                >取消</button>
+                <button
+                    id="save-edit-${promptId}"
+                    style="
+                        padding: 0.5rem 1rem;
+                        background: linear-gradient(45deg, #667eea, #764ba2);
+                        color: white;
+                        border: none;
+                        border-radius: 0.5rem;
+                        cursor: pointer;
+                        transition: all 0.2s ease;
+                    "
+                >保存并复制</button>
+            </div>
+        </div>
+    `;
+
+    document.body.appendChild(editDialog);
+
+    // 绑定按钮事件
+    document.getElementById(`cancel-edit-${promptId}`).addEventListener('click', () => {
+        document.body.removeChild(editDialog);
+    });
+
+    document.getElementById(`save-edit-${promptId}`).addEventListener('click', () => {
+        const editedContent = document.getElementById(`prompt-editor-${promptId}`).value;
+
+        // 复制编辑后的内容
+        if (navigator.clipboard && window.isSecureContext) {
+            navigator.clipboard.writeText(editedContent).then(() => {
+                showCopySuccess(promptId);
+                document.body.removeChild(editDialog);
+            }).catch(err => {
+                console.error('复制失败:', err);
+                fallbackCopy(editedContent);
+                document.body.removeChild(editDialog);
+            });
+        } else {
+            fallbackCopy(editedContent);
+            document.body.removeChild(editDialog);
+        }
+    });
+
+    // ESC键关闭
+    const escapeHandler = (e) => {
+        if (e.key === 'Escape') {
+            document.body.removeChild(editDialog);
+            document.removeEventListener('keydown', escapeHandler);
+        }
+    };
+    document.addEventListener('keydown', escapeHandler);
+
+    // 点击外部关闭
+    editDialog.addEventListener('click', (e) => {
+        if (e.target === editDialog) {
+            document.body.removeChild(editDialog);
+            document.removeEventListener('keydown', escapeHandler);
+        }
+    });
+}
+
+// 降级复制方案
+function fallbackCopy(text, successMessage = '✅ 提示词已复制到剪贴板！') {
+    const textArea = document.createElement('textarea');
+    textArea.value = text;
+    document.body.appendChild(textArea);
+    textArea.select();
+    try {
+        document.execCommand('copy');
+        alert(successMessage);
+    } catch (err) {
+        alert('❌ 复制失败，请手动选择文本复制');
+    }
+    document.body.removeChild(textArea);
+}
+
+// 复制整段内容（开发计划与编程提示词按钮共用）
+function copyTextToClipboard(text, successMessage) {
+    if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(text).then(() => {
+            alert(successMessage);
+        }).catch(err => {
+            console.error('复制失败:', err);
+            fallbackCopy(text, successMessage);
+        });
+    } else {
+        fallbackCopy(text, successMessage);
+    }
+}
+
+// 显示复制成功提示
+function showCopySuccess(promptId) {
+    const successMsg = document.getElementById('copy-success-' + promptId);
+    if (successMsg) {
+        successMsg.style.display = 'inline';
+        setTimeout(() => {
+            successMsg.style.display = 'none';
+        }, 2000);
+    }
+}
+
+// 复制和编辑按钮使用事件委托，动态生成的按钮无需重复绑定
+document.addEventListener('click', function(event) {
+    const button = event.target.closest('.individual-copy-btn, .edit-prompt-btn');
+    if (!button) {
+        return;
+    }
+
+    const promptId = button.dataset.promptId;
+    const promptContent = button.dataset.promptContent || '';
+    if (button.classList.contains('individual-copy-btn')) {
+        copyIndividualPrompt(promptId, promptContent);
+    } else {
+        editIndividualPrompt(promptId, promptContent);
+    }
+});
+
+// 页面与Mermaid均就绪后初始化
+onPageReady(() => whenMermaidReady(function() {
+    updateMermaidTheme();
+
+    // 监听主题切换
+    const observer = new MutationObserver(function(mutations) {
+        mutations.forEach(function(mutation) {
+            if (mutation.type === 'attributes' && mutation.attributeName === 'class') {
+                updateMermaidTheme();
+                // 重新渲染所有Mermaid图表
+                setTimeout(() => {
+                    mermaid.run({
+                        nodes: document.querySelectorAll('.mermaid'),
+                        suppressErrors: true
+                    });
+                }, 100);
+            }
+        });
+    });
+    observer.observe(document.documentElement, { attributes: true });
+}));
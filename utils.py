@@ -0,0 +1,65 @@
+"""
+公共工具函数
+JSON序列化与HTTP会话构建辅助函数，供各模块共用
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 瞬时故障时重试的HTTP状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 可选的高性能JSON库，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_loads(data):
+    """解析JSON（str或bytes），优先使用orjson；解析失败时抛出 json.JSONDecodeError"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """序列化为UTF-8编码的JSON字节串（保留中文原文），优先使用orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys).encode('utf-8')
+
+def create_session(
+    pool_connections: int,
+    pool_maxsize: int,
+    retries: int = 2,
+    backoff_factor: float = 0.3,
+    headers: Optional[Dict[str, str]] = None
+) -> requests.Session:
+    """
+    创建带连接池的HTTP会话，复用TCP/TLS连接。
+    
+    retries>0 时对连接错误和 RETRY_STATUS_CODES 进行指数退避重试
+    （POST默认不在重试方法内，不会重复发送请求）；retries=0 时不重试。
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    
+    max_retries = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False
+    ) if retries > 0 else 0
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session